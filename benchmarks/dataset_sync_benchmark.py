@@ -0,0 +1,123 @@
+"""Compare recreating a LangSmith dataset with a diff-based DatasetSync.
+
+Runs against an in-memory fake client with a fixed per-request latency.
+Run from the project root:
+
+    python -m benchmarks.dataset_sync_benchmark --examples 10000 --latency-ms 50
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+
+from benchmarks.fake_langsmith import FakeLangSmithClient
+from dataset_sync import DatasetSpec, DatasetSync, ExampleSpec
+
+DATASET = "Benchmark: Regression"
+
+
+def example_id(name):
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{DATASET}/{name}"))
+
+
+def synthetic_spec(count, seed=0):
+    rng = random.Random(seed)
+    return DatasetSpec(DATASET, examples=[
+        ExampleSpec(
+            inputs={"question": f"Question {i}: {rng.random():.12f}"},
+            outputs={"output": f"Answer {i}"},
+            id=example_id(i),
+        )
+        for i in range(count)
+    ])
+
+
+def edited(spec, fraction, seed=1):
+    """A copy of `spec` with `fraction` of its examples changed, added or removed"""
+    rng = random.Random(seed)
+    examples = list(spec.examples)
+    touched = max(1, int(len(examples) * fraction))
+    for i in rng.sample(range(len(examples)), touched):
+        examples[i] = ExampleSpec(inputs=examples[i].inputs, outputs={"output": f"Revised answer {i}"},
+                                  id=examples[i].id)
+    del examples[:touched]
+    examples.extend(
+        ExampleSpec(inputs={"question": f"New question {i}"}, outputs={"output": "New"}, id=example_id(f"new-{i}"))
+        for i in range(touched)
+    )
+    return DatasetSpec(spec.name, examples=examples)
+
+
+def recreate(client, spec, batch_size):
+    """What the old loaders required: drop the dataset and upload everything again"""
+    if client.has_dataset(dataset_name=spec.name):
+        client.delete_dataset(dataset_name=spec.name)
+    dataset = client.create_dataset(spec.name)
+    for i in range(0, len(spec.examples), batch_size):
+        client.create_examples(dataset_id=dataset.id, examples=[
+            {"inputs": example.inputs, "outputs": example.outputs}
+            for example in spec.examples[i:i + batch_size]
+        ])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--examples", type=int, default=10000)
+    parser.add_argument("--edit-fraction", type=float, default=0.01)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0, help="requests per second, 0 for unlimited")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    args = parser.parse_args()
+
+    spec = synthetic_spec(args.examples)
+    changed = edited(spec, args.edit_fraction)
+    latency = args.latency_ms / 1000
+
+    def engine(client):
+        return DatasetSync(client, max_workers=args.workers, batch_size=args.batch_size, rate=args.rate)
+
+    baseline_client = FakeLangSmithClient(latency)
+    _, recreate_s = timed(lambda: recreate(baseline_client, changed, args.batch_size))
+
+    client = FakeLangSmithClient(latency)
+    _, initial_s = timed(lambda: engine(client).sync([spec]))
+    _, noop_s = timed(lambda: engine(client).sync([spec]))
+    calls_before = client.calls
+    edit, edit_s = timed(lambda: engine(client).sync([changed]))
+    edit_calls = client.calls - calls_before
+
+    dataset_id = str(client.datasets[DATASET].id)
+    remote = {row.inputs["question"]: row.outputs for row in client.examples[dataset_id].values()}
+    expected = {example.inputs["question"]: example.outputs for example in changed.examples}
+    assert remote == expected, "synced dataset differs from the spec"
+
+    results = {
+        "examples": args.examples,
+        "edited_examples": edit[DATASET],
+        "latency_ms": args.latency_ms,
+        "recreate_s": round(recreate_s, 3),
+        "recreate_requests": baseline_client.calls,
+        "initial_sync_s": round(initial_s, 3),
+        "noop_sync_s": round(noop_s, 3),
+        "edit_sync_s": round(edit_s, 3),
+        "edit_sync_requests": edit_calls,
+        "edit_speedup": round(recreate_s / edit_s, 2),
+    }
+    for name, value in results.items():
+        print(f"{name:>20}: {value}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
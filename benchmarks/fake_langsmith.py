@@ -0,0 +1,93 @@
+"""In-memory stand-in for the parts of the LangSmith client that dataset_sync.py uses.
+
+This replaces the `Client` object rather than serving the LangSmith HTTP
+API, so benchmarks against it count requests and simulated latency but
+not the real client's serialization or connection handling.
+
+Each call sleeps for `latency` seconds to stand in for a round trip, and every
+`fail_every`-th call raises a rate-limit error so retries are exercised.
+"""
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+from langsmith.utils import LangSmithRateLimitError
+
+
+class FakeLangSmithClient:
+    def __init__(self, latency=0.0, fail_every=None):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.datasets = {}
+        self.examples = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.calls += 1
+            fail = self.fail_every and self.calls % self.fail_every == 0
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise LangSmithRateLimitError("429 Too Many Requests")
+
+    def has_dataset(self, *, dataset_name=None, dataset_id=None):
+        self._request()
+        return dataset_name in self.datasets
+
+    def read_dataset(self, *, dataset_name=None, dataset_id=None):
+        self._request()
+        return self.datasets[dataset_name]
+
+    def create_dataset(self, dataset_name, *, description=None, **kwargs):
+        self._request()
+        with self._lock:
+            dataset = SimpleNamespace(id=uuid.uuid4(), name=dataset_name, description=description)
+            self.datasets[dataset_name] = dataset
+            self.examples[str(dataset.id)] = {}
+        return dataset
+
+    def delete_dataset(self, *, dataset_name=None, dataset_id=None):
+        self._request()
+        with self._lock:
+            dataset = self.datasets.pop(dataset_name)
+            del self.examples[str(dataset.id)]
+
+    def list_examples(self, dataset_id=None, **kwargs):
+        self._request()
+        with self._lock:
+            examples = list(self.examples[str(dataset_id)].values())
+        return iter(examples)
+
+    def create_examples(self, *, dataset_id=None, examples=None, **kwargs):
+        self._request()
+        with self._lock:
+            rows = self.examples[str(dataset_id)]
+            for example in examples:
+                example_id = str(example.get("id") or uuid.uuid4())
+                rows[example_id] = SimpleNamespace(
+                    id=example_id,
+                    inputs=example["inputs"],
+                    outputs=example.get("outputs"),
+                    # LangSmith adds the split to every example's metadata
+                    metadata={"dataset_split": ["base"], **(example.get("metadata") or {})},
+                )
+
+    def update_examples(self, *, dataset_id=None, updates=None, **kwargs):
+        self._request()
+        with self._lock:
+            rows = self.examples[str(dataset_id)]
+            for update in updates:
+                row = rows[str(update["id"])]
+                for name in ("inputs", "outputs", "metadata"):
+                    if update.get(name) is not None:
+                        setattr(row, name, update[name])
+
+    def delete_examples(self, example_ids, **kwargs):
+        self._request()
+        with self._lock:
+            for rows in self.examples.values():
+                for example_id in example_ids:
+                    rows.pop(str(example_id), None)
@@ -0,0 +1,153 @@
+"""In-memory stand-in for the parts of the Weaviate v4 client that vectorstore.py uses.
+
+Objects are stored in a LocalIndex, and `near_text` is served by embedding the
+query with the given embedder, the way a text2vec module would server-side.
+"""
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from local_index import LocalIndex
+
+
+def _objects(hits):
+    return SimpleNamespace(objects=[
+        SimpleNamespace(
+            uuid=hit["uuid"],
+            properties=hit["properties"],
+            metadata=SimpleNamespace(score=hit["score"], distance=hit["distance"]),
+        )
+        for hit in hits
+    ])
+
+
+class _DynamicBatch:
+    def __init__(self, collection):
+        self.collection = collection
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+        return False
+
+    def add_object(self, properties, uuid=None, vector=None):
+        if vector is None:
+            vector = self.collection.embedder.embed_query(properties.get("content", ""))
+        self.pending.append((str(uuid), properties, vector))
+        if len(self.pending) >= self.collection.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Stand in for the server round trip of one batch request
+        if self.collection.batch_latency:
+            time.sleep(self.collection.batch_latency)
+        for uuid, properties, vector in self.pending:
+            self.collection.index.upsert(uuid, properties, vector)
+        self.collection.batch_sizes.append(len(self.pending))
+        self.pending = []
+
+
+class _BatchManager:
+    def __init__(self, collection):
+        self.collection = collection
+        self.failed_objects = []
+
+    def dynamic(self):
+        return _DynamicBatch(self.collection)
+
+
+class _Query:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def near_text(self, query, limit, return_metadata=None):
+        return self.near_vector(self.collection.embedder.embed_query(query), limit)
+
+    def near_vector(self, near_vector, limit, return_metadata=None):
+        return _objects(self.collection.index.search_vector(near_vector, limit))
+
+    def bm25(self, query, limit, return_metadata=None):
+        return _objects(self.collection.index.search_bm25(query, limit))
+
+    def hybrid(self, query, vector=None, alpha=0.75, limit=5, return_metadata=None):
+        if vector is None:
+            vector = self.collection.embedder.embed_query(query)
+        return _objects(self.collection.index.search_hybrid(query, vector, limit, alpha=alpha))
+
+
+class _Data:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def delete_many(self, where):
+        self.collection.index.delete(str(uuid) for uuid in where.value)
+
+
+class _Aggregate:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def over_all(self, total_count=True):
+        return SimpleNamespace(total_count=len(self.collection.index))
+
+
+class FakeCollection:
+    def __init__(self, name, index, embedder, batch_size, batch_latency):
+        self.name = name
+        self.index = index
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.batch_sizes = []
+        self.batch = _BatchManager(self)
+        self.query = _Query(self)
+        self.data = _Data(self)
+        self.aggregate = _Aggregate(self)
+
+    def iterator(self, return_properties=None):
+        for uuid in list(self.index.row_of):
+            yield SimpleNamespace(uuid=uuid)
+
+
+class _Collections:
+    def __init__(self, client):
+        self.client = client
+        self._collections = {}
+
+    def exists(self, name):
+        return name in self._collections
+
+    def delete(self, name):
+        self._collections.pop(name, None)
+
+    def create(self, name, **config):
+        self._collections[name] = FakeCollection(
+            name, LocalIndex(self.client.index_dir / name), self.client.embedder,
+            self.client.batch_size, self.client.batch_latency,
+        )
+        return self._collections[name]
+
+    def get(self, name):
+        return self._collections[name]
+
+
+class FakeWeaviateClient:
+    """Minimal Weaviate client: collections, dynamic batching, near_text/near_vector/bm25/hybrid"""
+
+    def __init__(self, embedder, index_dir, batch_size=100, batch_latency=0.0):
+        self.embedder = embedder
+        self.index_dir = Path(index_dir)
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.collections = _Collections(self)
+
+    def is_ready(self):
+        return True
+
+    def close(self):
+        pass
@@ -0,0 +1,104 @@
+"""Check fetcher.py's conditional requests against the local page server.
+
+Fetches synthetic pages into an empty HTTP cache, fetches them again (the
+server must answer 304 and the pages must come from the cache), revalidates
+by Last-Modified alone, then stops the server and checks that cached pages
+fall back to the stale copy while uncached ones still raise. A 304 whose
+cached copy has gone missing must re-fetch the page in full. Exits non-zero
+when any check fails. Run from the project root:
+
+    python -m benchmarks.fetch_cache_check --pages 20
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import requests
+
+from benchmarks.page_server import start_page_server
+from fetcher import HTTPCache, fetch_pages, fetch_url
+
+
+def fetch_all(urls, cache_dir):
+    return list(fetch_pages(urls, max_workers=4, cache_dir=cache_dir, timeout=5))
+
+
+def run_checks(pages):
+    checks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "http"
+        server = start_page_server(paragraphs=3)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        urls = [f"{base_url}/pages/{i}" for i in range(pages)]
+        try:
+            first = fetch_all(urls, cache_dir)
+            checks["first fetch downloads every page"] = (
+                not any(result.from_cache for result in first) and server.statuses[200] == pages
+            )
+
+            second = fetch_all(urls, cache_dir)
+            checks["second fetch is answered 304"] = server.statuses[304] == pages
+            checks["second fetch is served from the cache"] = all(result.from_cache for result in second)
+            checks["cached pages match the originals"] = (
+                [result.html for result in second] == [result.html for result in first]
+            )
+
+            # Drop the ETag of one entry so only If-Modified-Since is sent
+            cache = HTTPCache(cache_dir)
+            meta, body = cache.get(urls[0])
+            cache.put(urls[0], body, {"Last-Modified": meta["last_modified"]}, encoding=meta["encoding"])
+            checks["If-Modified-Since alone revalidates"] = (
+                cache.conditional_headers(urls[0]).keys() == {"If-Modified-Since"}
+                and fetch_url(urls[0], cache, timeout=5).from_cache
+                and server.statuses[304] == pages + 1
+            )
+
+            # Lose the cached copy between revalidation and reading it back
+            vanishing = HTTPCache(cache_dir)
+            reads = []
+
+            def get_once(url):
+                # The first read builds the conditional headers, the second follows the 304
+                reads.append(url)
+                return None if len(reads) == 2 else cache.get(url)
+
+            vanishing.get = get_once
+            statuses = dict(server.statuses)
+            result = fetch_url(urls[1], vanishing, timeout=5)
+            checks["a 304 without a cached copy re-fetches the page"] = (
+                not result.from_cache and result.html == first[1].html
+                and server.statuses[304] == statuses[304] + 1 and server.statuses[200] == statuses[200] + 1
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        stale = fetch_all(urls, cache_dir)
+        checks["stale copy is used when the server is down"] = (
+            all(result.from_cache for result in stale)
+            and [result.html for result in stale] == [result.html for result in first]
+        )
+        try:
+            fetch_url(f"{base_url}/pages/{pages}", HTTPCache(cache_dir), timeout=5)
+            checks["uncached page raises when the server is down"] = False
+        except requests.RequestException:
+            checks["uncached page raises when the server is down"] = True
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+
+    checks = run_checks(args.pages)
+    for name, passed in checks.items():
+        print(f"{'ok' if passed else 'FAIL':>4}  {name}")
+    print(json.dumps({"passed": sum(checks.values()), "failed": len(checks) - sum(checks.values())}))
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
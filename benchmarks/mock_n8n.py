@@ -0,0 +1,85 @@
+"""Local stand-in for n8n chat webhooks, for exercising replay.py offline.
+
+Accepts the chatTrigger payload at /webhook/<id>/chat, sleeps to stand in for
+the agent, and answers with {"output": ...}. A fraction of requests can be
+made to fail. Run standalone from the project root:
+
+    python -m benchmarks.mock_n8n --port 5679 --latency-ms 200
+"""
+import argparse
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from http_service import JSONRequestHandler, serve_in_background
+
+WEBHOOK_PATH = re.compile(r"^/webhook/([^/]+)/chat/?$")
+
+
+class _WebhookHandler(JSONRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    # Messages seen per (webhook, sessionId), shared by every request thread
+    sessions = None
+    lock = None
+
+    def do_POST(self):
+        match = WEBHOOK_PATH.match(self.path)
+        payload = self.read_json()
+        if not isinstance(payload, dict):
+            payload = {}
+        if match is None:
+            self.reply(404, {"message": "webhook not registered"})
+            return
+        if payload.get("action") != "sendMessage" or not payload.get("sessionId") or "chatInput" not in payload:
+            self.reply(400, {"message": "expected action, sessionId and chatInput"})
+            return
+
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if random.random() < self.error_rate:
+            self.reply(500, {"message": "Error in workflow"})
+            return
+        with self.lock:
+            self.sessions[(match.group(1), payload["sessionId"])] += 1
+            turn = self.sessions[(match.group(1), payload["sessionId"])]
+        self.reply(200, {"output": f"[{match.group(1)} turn {turn}] {payload['chatInput'][:200]}"})
+
+
+def start_mock_webhook(latency=0.0, jitter=0.0, error_rate=0.0, port=0):
+    """Serve mock chat webhooks at http://127.0.0.1:<port>/webhook/<id>/chat from a background thread"""
+    handler = type("WebhookHandler", (_WebhookHandler,), {
+        "latency": latency,
+        "jitter": jitter,
+        "error_rate": error_rate,
+        "sessions": Counter(),
+        "lock": threading.Lock(),
+    })
+    server = serve_in_background(handler, port=port)
+    server.sessions = handler.sessions
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=5679)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_mock_webhook(
+        args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, port=args.port
+    )
+    print(f"Mock n8n webhooks at http://127.0.0.1:{server.server_port}/webhook/<id>/chat")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Synthetic documentation pages served over local HTTP for offline benchmarks.
+
+Pages are deterministic per id, carry an ETag and Last-Modified, and
+conditional requests are answered with 304 like a real docs site. Run
+standalone from the project root:
+
+    python -m benchmarks.page_server --port 8766 --paragraphs 50
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+
+from http_service import serve_in_background
+
+WORDS = (
+    "graph node edge state checkpoint interrupt stream agent tool memory "
+    "supervisor planner executor retrieval vector embedding prompt model "
+    "persistence thread human loop message reducer channel subgraph "
+    "langgraph langchain langsmith trace evaluation dataset workflow"
+).split()
+
+# About 150 words per paragraph keeps each paragraph near one 200-token chunk
+WORDS_PER_PARAGRAPH = 150
+
+
+def synthetic_page(page_id, paragraphs):
+    """Deterministic HTML for one synthetic documentation page"""
+    rng = random.Random(page_id)
+    body = "\n".join(
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(WORDS_PER_PARAGRAPH)) + ".</p>"
+        for _ in range(paragraphs)
+    )
+    return (f'<html lang="en"><head><title>Synthetic page {page_id}</title></head>'
+            f"<body>{body}</body></html>").encode("utf-8")
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    paragraphs = 50
+    # Every page has the same Last-Modified, so revalidation works by date too
+    last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+    # Responses sent per status code, shared by every request thread
+    statuses = None
+    lock = None
+
+    def do_GET(self):
+        try:
+            page_id = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            self.send_error(404)
+            return
+        etag = f'"{page_id}-{self.paragraphs}"'
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            not_modified = etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*"
+        else:
+            not_modified = self.headers.get("If-Modified-Since") == self.last_modified
+        with self.lock:
+            self.statuses[304 if not_modified else 200] += 1
+        if not_modified:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", self.last_modified)
+            self.end_headers()
+            return
+        body = synthetic_page(page_id, self.paragraphs)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_page_server(paragraphs, port=0):
+    """Serve synthetic pages at http://127.0.0.1:<port>/pages/<id> from a background thread.
+
+    Conditional requests (If-None-Match / If-Modified-Since) get a 304;
+    `server.statuses` counts the responses sent per status code.
+    """
+    handler = type("PageHandler", (_PageHandler,), {
+        "paragraphs": paragraphs,
+        "statuses": Counter(),
+        "lock": threading.Lock(),
+    })
+    server = serve_in_background(handler, port=port)
+    server.statuses = handler.statuses
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--paragraphs", type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_page_server(args.paragraphs, port=args.port)
+    print(f"Synthetic pages at http://127.0.0.1:{server.server_port}/pages/<id>")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Benchmark ingestion and retrieval through the vectorstore.py code paths.
+
+Synthetic documentation pages are served from a local HTTP server, fetched
+with fetcher.iter_documents, split with ParallelSplitter, embedded with the
+offline HashEmbedder, uploaded through WeaviateBackend's
+collection.batch.dynamic() into an in-memory Weaviate stand-in (or straight
+into LocalBackend), and queried with near_text. Apart from tiktoken's BPE
+files, nothing leaves the machine: the splitter downloads them on first use
+(into TIKTOKEN_CACHE_DIR when set), so run once online or point that
+variable at a warm cache before benchmarking offline.
+
+Run from the project root:
+
+    python -m benchmarks.pipeline_benchmark --sizes 1000,10000,100000
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+import vectorstore as vs
+from benchmarks.fake_weaviate import FakeWeaviateClient
+from benchmarks.page_server import WORDS, start_page_server
+from embeddings import EmbeddingCache, HashEmbedder
+from fetcher import iter_documents
+from index_manifest import IndexManifest
+from instrumentation import StageTimer
+from local_index import LocalIndex
+from metrics import summarize
+from splitting import DEFAULT_PROCESSES, ParallelSplitter, build_splitter
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class TimedEmbedder:
+    """Wraps an embedder and accumulates time spent embedding"""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.model = embedder.model
+        self.dimensions = embedder.dimensions
+        self.seconds = 0.0
+
+    def embed_documents(self, texts):
+        start = time.perf_counter()
+        try:
+            return self.embedder.embed_documents(texts)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def embed_query(self, text):
+        return self.embedder.embed_query(text)
+
+
+def make_backend(kind, embedder, workdir, batch_latency):
+    if kind == "local":
+        return vs.LocalBackend(LocalIndex(workdir / "local_index")), None
+    client = FakeWeaviateClient(embedder, workdir / "weaviate", batch_latency=batch_latency)
+    manager = vs.WeaviateClientManager(connect=lambda: client)
+    return vs.WeaviateBackend(manager), client
+
+
+def run_size(target_chunks, args, base_url):
+    pages = max(1, math.ceil(target_chunks / args.paragraphs))
+    urls = [f"{base_url}/pages/{i}" for i in range(pages)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        embedder = TimedEmbedder(HashEmbedder(args.dimensions))
+        backend, client = make_backend(args.backend, embedder, workdir, args.batch_latency_ms / 1000)
+        manifest = IndexManifest(backend.manifest_key(), workdir / "manifest.json")
+        embedding_cache = EmbeddingCache(embedder.model, embedder.dimensions, workdir / "embeddings")
+        splitter = ParallelSplitter(processes=args.processes or DEFAULT_PROCESSES,
+                                    cache_dir=workdir / "splits")
+        stats = vs.IngestStats()
+        timer = StageTimer()
+
+        start = time.perf_counter()
+        backend.open(recreate=True)
+        docs = timer.wrap("fetch", iter_documents(urls, max_workers=args.fetch_workers,
+                                                  cache_dir=workdir / "http"))
+        chunks = timer.wrap("split", splitter.split_documents(docs))
+        objects = timer.wrap("transform", vs.to_data_objects(chunks))
+        vs.sync_collection(backend, objects, manifest, embedder, stats, embedding_cache)
+        ingest_s = time.perf_counter() - start
+
+        stages = timer.exclusive(["fetch", "split", "transform"])
+        stages["embed"] = embedder.seconds
+        stages["upload"] = ingest_s - timer.inclusive["transform"] - embedder.seconds
+
+        rng = random.Random(0)
+        queries = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8)))
+                   for _ in range(args.queries)]
+        latencies = []
+        for query in queries:
+            query_start = time.perf_counter()
+            # Without an embedder the Weaviate backend issues near_text, as in production
+            if args.backend == "local":
+                vs.search(query, limit=5, embedder=embedder, backend=backend)
+            else:
+                vs.search(query, limit=5, backend=backend)
+            latencies.append(time.perf_counter() - query_start)
+
+        summary = stats.report()
+        result = {
+            "target_chunks": target_chunks,
+            "pages": pages,
+            "chunks": stats.chunks,
+            "ingest_s": round(ingest_s, 3),
+            "throughput_chunks_per_s": round(stats.chunks / ingest_s, 1) if ingest_s else None,
+            "time_to_first_upload_s": summary["time_to_first_upload_s"],
+            "peak_rss_mb": summary["peak_rss_mb"],
+            "stages_s": {name: round(seconds, 3) for name, seconds in stages.items()},
+            "query_latency_ms": summarize(latencies, scale=1000),
+        }
+        if client is not None:
+            sizes = [size for collection in client.collections._collections.values()
+                     for size in collection.batch_sizes]
+            result["upload_batches"] = len(sizes)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated corpus sizes in chunks (e.g. 1000,10000,100000,1000000)")
+    parser.add_argument("--backend", choices=["weaviate-mock", "local"], default="weaviate-mock")
+    parser.add_argument("--paragraphs", type=int, default=50, help="Paragraphs (about one chunk each) per page")
+    parser.add_argument("--dimensions", type=int, default=256, help="Embedding dimensions")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries timed per corpus size")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=None, help="Split worker processes")
+    parser.add_argument("--batch-latency-ms", type=float, default=0.0,
+                        help="Simulated server time per upload batch for the Weaviate stand-in")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/pipeline-<timestamp>.json)")
+    args = parser.parse_args()
+
+    # Load the encoder up front: offline without cached BPE files the split
+    # workers would otherwise die mid-run with BrokenProcessPool
+    try:
+        build_splitter()
+    except (requests.RequestException, OSError) as e:
+        parser.error(f"could not load the tiktoken encoder ({e}); "
+                     "run once with network access or set TIKTOKEN_CACHE_DIR to a warm cache")
+
+    started = datetime.now(timezone.utc)
+    server = start_page_server(args.paragraphs)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    runs = []
+    try:
+        for size in (int(value) for value in args.sizes.split(",")):
+            print(f"\n=== {size} chunks ===")
+            runs.append(run_size(size, args, base_url))
+            print(json.dumps(runs[-1], indent=2))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": started.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "runs": runs,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"pipeline-{started:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote {output}")
+
+
+if __name__ == "__main__":
+    main()
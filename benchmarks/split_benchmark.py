@@ -0,0 +1,98 @@
+"""Compare single-process splitting with ParallelSplitter on a synthetic corpus.
+
+Run from the project root:
+
+    python -m benchmarks.split_benchmark --megabytes 16 --processes 8
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+
+from langchain_core.documents import Document
+
+from splitting import CHUNK_OVERLAP, CHUNK_SIZE, ParallelSplitter, build_splitter
+
+WORDS = (
+    "graph node edge state checkpoint interrupt stream agent tool memory "
+    "supervisor planner executor retrieval vector embedding prompt model "
+    "persistence thread human loop message reducer channel subgraph"
+).split()
+
+
+def synthetic_corpus(megabytes, doc_kb=64, seed=0):
+    """Generate documents of roughly `doc_kb` KiB each totalling `megabytes` MiB"""
+    rng = random.Random(seed)
+    docs = []
+    target = megabytes * 1024 * 1024
+    total = 0
+    i = 0
+    while total < target:
+        paragraphs = []
+        size = 0
+        while size < doc_kb * 1024:
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24)))
+            paragraphs.append(sentence.capitalize() + ".")
+            size += len(paragraphs[-1]) + 1
+        text = "\n\n".join(paragraphs)
+        docs.append(Document(page_content=text, metadata={"source": f"synthetic://{i}"}))
+        total += len(text)
+        i += 1
+    return docs
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    args = parser.parse_args()
+
+    docs = synthetic_corpus(args.megabytes)
+    print(f"Corpus: {len(docs)} documents, {args.megabytes} MiB")
+
+    baseline, baseline_s = timed(
+        lambda: build_splitter(CHUNK_SIZE, CHUNK_OVERLAP).split_documents(docs)
+    )
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Measure the pool itself rather than the in-process warm-up
+        kwargs = {"cache_dir": cache_dir, "parallel_threshold": 0}
+        if args.processes:
+            kwargs["processes"] = args.processes
+        cold_splitter = ParallelSplitter(**kwargs)
+        cold, cold_s = timed(lambda: list(cold_splitter.split_documents(docs)))
+        warm_splitter = ParallelSplitter(**kwargs)
+        warm, warm_s = timed(lambda: list(warm_splitter.split_documents(docs)))
+
+    baseline_chunks = [doc.page_content for doc in baseline]
+    assert [doc.page_content for doc in cold] == baseline_chunks, "parallel output differs"
+    assert [doc.page_content for doc in warm] == baseline_chunks, "cached output differs"
+
+    results = {
+        "documents": len(docs),
+        "megabytes": args.megabytes,
+        "processes": cold_splitter.processes,
+        "chunks": len(baseline_chunks),
+        "single_process_s": round(baseline_s, 3),
+        "parallel_cold_s": round(cold_s, 3),
+        "parallel_warm_cache_s": round(warm_s, 3),
+        "cold_speedup": round(baseline_s / cold_s, 2),
+        "warm_speedup": round(baseline_s / warm_s, 2),
+    }
+    for name, value in results.items():
+        print(f"{name:>24}: {value}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
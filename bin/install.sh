@@ -5,9 +5,9 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(cd "$SCRIPT_DIR/.." && pwd)"
 
-docker volume create n8n_data
+docker volume create n8n_data >/dev/null
 
-python3 "$PROJECT_ROOT/vectorstore.py"
-
-python3 "$PROJECT_ROOT/datasets.py"
+# Indexes the docs and syncs the datasets, skipping either when its inputs
+# are unchanged since the last run; pass --force to redo them anyway
+python3 "$PROJECT_ROOT/bootstrap.py" "$@"
 
@@ -31,37 +31,61 @@ docker run -it --rm \
  -e LANGCHAIN_PROJECT="${LANGSMITH_PROJECT:-langsmith-debug}" \
  -e DB_SQLITE_POOL_SIZE=1 \
  -e N8N_BLOCK_ENV_ACCESS_IN_NODE=false \
+ ${PRECLASSIFIER_URL:+-e PRECLASSIFIER_URL="$PRECLASSIFIER_URL"} \
+ ${N8N_FORCE_IMPORT:+-e N8N_FORCE_IMPORT=1} \
+ --add-host=host.docker.internal:host-gateway \
  ${N8N_ENCRYPTION_KEY:+-e N8N_ENCRYPTION_KEY="$N8N_ENCRYPTION_KEY"} \
  -v n8n_data:/home/node/.n8n \
  -v "$PROJECT_ROOT/agents/basic.json":/workflows/basic.json:ro \
  -v "$PROJECT_ROOT/agents/adaptive.json":/workflows/adaptive.json:ro \
  -v "$PROJECT_ROOT/agents/guarded_adaptive.json":/workflows/guarded_adaptive.json:ro \
+ -v "$PROJECT_ROOT/agents/guarded_adaptive_fast.json":/workflows/guarded_adaptive_fast.json:ro \
  -v "$(echo $GENERATED_CREDS_FILES | awk '{print $1}')":/imports/credentials_openai.json:ro \
  -v "$(echo $GENERATED_CREDS_FILES | awk '{print $2}')":/imports/credentials_weaviate.json:ro \
  -v "$(echo $GENERATED_CREDS_FILES | awk '{print $3}')":/imports/credentials_tavily.json:ro \
  --entrypoint /bin/sh \
  n8nio/n8n -c '
  set -e
- # If credentials already exist, skip import to avoid duplicates
- if ! n8n export:credentials --all --output=/tmp/_creds.json >/dev/null 2>&1; then
-   echo "Warning: could not list credentials; proceeding to import"
-   n8n import:credentials --input=/imports/credentials_openai.json --decrypted || true
-   n8n import:credentials --input=/imports/credentials_weaviate.json --decrypted || true
-   n8n import:credentials --input=/imports/credentials_tavily.json --decrypted || true
- else
-   if ! grep -q "OpenAi Account" /tmp/_creds.json; then
-     n8n import:credentials --input=/imports/credentials_openai.json --decrypted || true
+ # Hashes of the last imported credential and workflow files live in the
+ # n8n volume, so unchanged files are not re-imported on every start
+ MARKERS=/home/node/.n8n/.imported
+ mkdir -p "$MARKERS"
+ imported() {
+   [ -z "${N8N_FORCE_IMPORT:-}" ] && [ -f "$MARKERS/$1.sha256" ] && [ "$(cat "$MARKERS/$1.sha256")" = "$2" ]
+ }
+ credential_exists() {
+   # Volumes from before the markers: fall back to looking the credential up by name
+   if [ ! -f /tmp/_creds.json ]; then
+     n8n export:credentials --all --output=/tmp/_creds.json >/dev/null 2>&1 || echo "[]" > /tmp/_creds.json
    fi
-   if ! grep -q "Weaviate Credentials Account" /tmp/_creds.json; then
-     n8n import:credentials --input=/imports/credentials_weaviate.json --decrypted || true
+   grep -q "$(grep -o "\"name\": \"[^\"]*\"" "$1" | head -n 1 | cut -d\" -f 4)" /tmp/_creds.json
+ }
+
+ started=$(date +%s)
+ for file in /imports/credentials_*.json; do
+   [ -f "$file" ] || continue
+   key=$(basename "$file")
+   sum=$(sha256sum "$file" | cut -d " " -f 1)
+   if imported "$key" "$sum"; then
+     continue
    fi
-   if [ -f /imports/credentials_tavily.json ] && ! grep -q "Tavily Account" /tmp/_creds.json; then
-     n8n import:credentials --input=/imports/credentials_tavily.json --decrypted || true
+   if [ -f "$MARKERS/$key.sha256" ] || [ -n "${N8N_FORCE_IMPORT:-}" ] || ! credential_exists "$file"; then
+     n8n import:credentials --input="$file" --decrypted || continue
    fi
- fi
- n8n import:workflow --input=/workflows/basic.json
- n8n import:workflow --input=/workflows/adaptive.json
- n8n import:workflow --input=/workflows/guarded_adaptive.json
- n8n start'
-
+   echo "$sum" > "$MARKERS/$key.sha256"
+ done
+ echo "Credentials ready in $(( $(date +%s) - started ))s"
 
+ started=$(date +%s)
+ for file in /workflows/*.json; do
+   key=$(basename "$file")
+   sum=$(sha256sum "$file" | cut -d " " -f 1)
+   if imported "$key" "$sum"; then
+     echo "Unchanged: $key"
+     continue
+   fi
+   n8n import:workflow --input="$file"
+   echo "$sum" > "$MARKERS/$key.sha256"
+ done
+ echo "Workflows ready in $(( $(date +%s) - started ))s"
+ n8n start'
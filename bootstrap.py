@@ -0,0 +1,145 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from index_manifest import atomic_write, content_hash
+from instrumentation import RunRecorder
+
+load_dotenv(".env")
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_MANIFEST_PATH = Path(os.getenv("BOOTSTRAP_MANIFEST", PROJECT_ROOT / ".cache" / "bootstrap.json"))
+CORPUS_MAX_AGE = float(os.getenv("BOOTSTRAP_CORPUS_MAX_AGE", "86400"))
+PHASES = ("corpus", "datasets")
+
+
+def fingerprint(*parts):
+    """SHA-256 over files (by name and content) and JSON-serializable values"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, Path):
+            digest.update(part.name.encode("utf-8"))
+            digest.update(part.read_bytes() if part.exists() else b"<missing>")
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class BootstrapManifest:
+    """Fingerprint of the inputs each bootstrap step last completed with.
+
+    A step whose inputs hash to the recorded fingerprint is skipped; the
+    file is rewritten atomically after every completed step.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        try:
+            self.steps = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.steps = {}
+
+    def unchanged(self, step, value, max_age=None):
+        entry = self.steps.get(step)
+        if entry is None or entry.get("fingerprint") != value:
+            return False
+        return max_age is None or time.time() - entry.get("completed_at", 0) < max_age
+
+    def record(self, step, value, **details):
+        self.steps[step] = {"fingerprint": value, "completed_at": time.time(), **details}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps(self.steps, indent=2))
+
+
+def bootstrap_corpus(manifest, force=False):
+    import vectorstore as vs
+    from embeddings import get_embedder
+    from index_manifest import IndexManifest
+    from splitting import CHUNK_OVERLAP, CHUNK_SIZE
+
+    embedder_name = os.getenv("EMBEDDER", "server")
+    backend_name = os.getenv("VECTOR_BACKEND", "weaviate")
+    backend = vs.get_backend(backend_name)
+    # Everything that decides which objects end up in the collection
+    value = fingerprint(
+        vs.LANGGRAPH_DOCS, vs.COLLECTION_NAME, CHUNK_SIZE, CHUNK_OVERLAP,
+        embedder_name, backend.manifest_key(),
+        *(PROJECT_ROOT / name for name in ("vectorstore.py", "splitting.py", "index_manifest.py", "fetcher.py")),
+    )
+    indexed = IndexManifest(backend.manifest_key()).objects
+    # Pages can change upstream, so even unchanged inputs are re-synced after CORPUS_MAX_AGE
+    if not force and indexed and manifest.unchanged("corpus", value, max_age=CORPUS_MAX_AGE):
+        return {"status": "skipped", "objects": len(indexed)}
+    report = vs.load_and_upload_docs(embedder=get_embedder(embedder_name), backend=backend)
+    manifest.record("corpus", value, objects=len(IndexManifest(backend.manifest_key()).objects))
+    return {"status": "ran", **report["summary"]}
+
+
+def langsmith_identity(client):
+    """Endpoint and workspace a LangSmith client writes to; the API key is only kept as a hash"""
+    api_key = client.api_key or ""
+    return {
+        "endpoint": client.api_url,
+        "workspace": os.getenv("LANGSMITH_WORKSPACE_ID"),
+        "api_key": content_hash(api_key),
+    }
+
+
+def bootstrap_datasets(manifest, force=False):
+    import datasets
+    from dataset_sync import DEFAULT_SPEC_DIR
+
+    # A different endpoint, workspace or key may not have the datasets yet
+    value = fingerprint(
+        *sorted(DEFAULT_SPEC_DIR.iterdir()), PROJECT_ROOT / "dataset_sync.py",
+        langsmith_identity(datasets.client),
+    )
+    if not force and manifest.unchanged("datasets", value):
+        return {"status": "skipped"}
+
+    report = datasets.sync_datasets()
+    manifest.record("datasets", value)
+    return {"status": "ran", "datasets": report}
+
+
+STEPS = {
+    "corpus": bootstrap_corpus,
+    "datasets": bootstrap_datasets,
+}
+
+
+def run(phases=PHASES, force=(), manifest=None):
+    """Run the given phases in order, skipping those whose inputs are unchanged"""
+    manifest = manifest or BootstrapManifest()
+    recorder = RunRecorder("bootstrap")
+    for phase in phases:
+        with recorder.span(phase) as attributes:
+            attributes.update(STEPS[phase](manifest, force=phase in force))
+    return recorder
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index the docs and sync the datasets, "
+                                                 "skipping whatever has not changed")
+    parser.add_argument("--only", nargs="+", choices=PHASES, help="run only these phases")
+    parser.add_argument(
+        "--force", nargs="*", choices=PHASES,
+        help="re-run these phases (all when none are named) even if unchanged",
+    )
+    parser.add_argument("--report", help="Where to write the JSON timing report")
+    args = parser.parse_args()
+
+    phases = [phase for phase in PHASES if phase in (args.only or PHASES)]
+    force = PHASES if args.force == [] else (args.force or ())
+    recorder = run(phases, force)
+
+    for span in recorder.spans:
+        print(f"{span['name']:>12}: {span['attributes'].get('status'):<9} {span['duration_s']:8.2f}s")
+    report = recorder.report(summary={span["name"]: span["attributes"].get("status") for span in recorder.spans})
+    recorder.write(report, args.report)
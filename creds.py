@@ -13,7 +13,41 @@ def create_random_id(length: int = 16) -> str:
     return "".join(random.choice(alphabet) for _ in range(length))
 
 
-def main() -> None:
+def workflow_credential_ids() -> dict:
+    """Credential IDs the workflows in agents/ refer to, keyed by credential name"""
+    ids = {}
+    for path in sorted((Path(__file__).resolve().parent / "agents").glob("*.json")):
+        for node in json.loads(path.read_text(encoding="utf-8"))["nodes"]:
+            for credential in node.get("credentials", {}).values():
+                ids.setdefault(credential["name"], credential["id"])
+    return ids
+
+
+def stable_id(path: Path, name: str, workflow_ids: dict) -> str:
+    """Keep the ID of an earlier credentials file so re-imports update rather than duplicate"""
+    try:
+        for entry in json.loads(path.read_text(encoding="utf-8")):
+            if entry.get("name") == name and entry.get("id"):
+                return entry["id"]
+    except (OSError, ValueError):
+        pass
+    return workflow_ids.get(name) or create_random_id()
+
+
+def write_if_changed(path: Path, payload) -> bool:
+    """Write JSON only when it differs, so unchanged files keep their content hash and mtime"""
+    text = json.dumps(payload, ensure_ascii=False, indent=2)
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def write_credentials() -> list:
+    """Write the n8n credential import files and return their paths"""
     openai_key = os.environ.get("OPENAI_API_KEY", "")
     weaviate_url = os.environ.get("WEAVIATE_URL", "")
     weaviate_key = os.environ.get("WEAVIATE_API_KEY", "")
@@ -24,12 +58,16 @@ def main() -> None:
             "Missing environment: OPENAI_API_KEY, WEAVIATE_URL, WEAVIATE_API_KEY, TAVILY_API_KEY"
         )
 
-    # Create two separate files, each with a single-element array
+    # Create three separate files, each with a single-element array
     project_root = Path(__file__).resolve().parents[1]
+    openai_out = project_root / "credentials_openai.json"
+    weaviate_out = project_root / "credentials_weaviate.json"
+    tavily_out = project_root / "credentials_tavily.json"
+    workflow_ids = workflow_credential_ids()
 
     openai_payload = [
         {
-            "id": create_random_id(),
+            "id": stable_id(openai_out, "OpenAi Account", workflow_ids),
             "name": "OpenAi Account",
             "type": "openAiApi",
             "data": {"apiKey": openai_key},
@@ -37,7 +75,7 @@ def main() -> None:
     ]
     weaviate_payload = [
         {
-            "id": create_random_id(),
+            "id": stable_id(weaviate_out, "Weaviate Credentials Account", workflow_ids),
             "name": "Weaviate Credentials Account",
             "type": "weaviateApi",
             "data": {
@@ -49,25 +87,22 @@ def main() -> None:
 
     tavily_payload = [
         {
-            "id": create_random_id(),
+            "id": stable_id(tavily_out, "Tavily Account", workflow_ids),
             "name": "Tavily Account",
             "type": "tavilyApi",
             "data": {"apiKey": tavily_key},
         }
     ]
 
-    openai_out = project_root / "credentials_openai.json"
-    weaviate_out = project_root / "credentials_weaviate.json"
-    tavily_out = project_root / "credentials_tavily.json"
+    write_if_changed(openai_out, openai_payload)
+    write_if_changed(weaviate_out, weaviate_payload)
+    write_if_changed(tavily_out, tavily_payload)
+
+    return [openai_out, weaviate_out, tavily_out]
 
-    with openai_out.open("w", encoding="utf-8") as f:
-        json.dump(openai_payload, f, ensure_ascii=False, indent=2)
-    with weaviate_out.open("w", encoding="utf-8") as f:
-        json.dump(weaviate_payload, f, ensure_ascii=False, indent=2)
-    with tavily_out.open("w", encoding="utf-8") as f:
-        json.dump(tavily_payload, f, ensure_ascii=False, indent=2)
-       
-    paths = [str(openai_out), str(weaviate_out), str(tavily_out)]
+
+def main() -> None:
+    paths = [str(path) for path in write_credentials()]
 
     # Print generated paths space-separated for easy parsing
     print(" ".join(paths))
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+from langsmith.utils import (
+    LangSmithAPIError,
+    LangSmithConnectionError,
+    LangSmithRateLimitError,
+    LangSmithRequestTimeout,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_SPEC_DIR = Path(os.getenv("DATASET_SPEC_DIR", PROJECT_ROOT / "dataset_specs"))
+DEFAULT_MAX_WORKERS = int(os.getenv("DATASET_SYNC_WORKERS", "4"))
+DEFAULT_BATCH_SIZE = int(os.getenv("DATASET_SYNC_BATCH_SIZE", "100"))
+DEFAULT_RATE = float(os.getenv("DATASET_SYNC_RATE", "10"))
+DEFAULT_RETRIES = int(os.getenv("DATASET_SYNC_RETRIES", "3"))
+RETRY_BACKOFF_S = 1.0
+
+# Metadata key holding the hash of the spec an example was last synced from
+HASH_KEY = "sync_hash"
+EXAMPLE_NAMESPACE = uuid.UUID("5b7c7a8e-4c1e-4f0a-9a57-3f1d2b8e6c41")
+RETRYABLE_ERRORS = (
+    LangSmithRateLimitError,
+    LangSmithConnectionError,
+    LangSmithRequestTimeout,
+    LangSmithAPIError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _hash(value):
+    return hashlib.sha256(_canonical(value).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ExampleSpec:
+    inputs: dict
+    outputs: dict = None
+    metadata: dict = None
+    id: str = None
+
+    def key(self, dataset_name):
+        """Stable example id: the explicit `id`, else derived from the inputs"""
+        if self.id:
+            return str(self.id)
+        return str(uuid.uuid5(EXAMPLE_NAMESPACE, f"{dataset_name}|{_canonical(self.inputs)}"))
+
+    def content_hash(self):
+        return _hash({"inputs": self.inputs, "outputs": self.outputs, "metadata": self.metadata or {}})
+
+
+@dataclass
+class DatasetSpec:
+    name: str
+    description: str = None
+    examples: list = field(default_factory=list)
+
+
+def _example_from_record(record):
+    return ExampleSpec(
+        inputs=record["inputs"],
+        outputs=record.get("outputs"),
+        metadata=record.get("metadata"),
+        id=record.get("id"),
+    )
+
+
+def _read_jsonl(path, specs):
+    # Every line is an example carrying its dataset name; a line without
+    # inputs may instead set the dataset's description
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "dataset" not in record:
+                raise ValueError(f"{path}:{number}: missing 'dataset'")
+            spec = specs.setdefault(record["dataset"], DatasetSpec(record["dataset"]))
+            if record.get("description"):
+                spec.description = record["description"]
+            if "inputs" in record:
+                spec.examples.append(_example_from_record(record))
+
+
+def _read_yaml(path, specs):
+    # A mapping {name, description, examples} or a list of them
+    data = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or []
+    for entry in data if isinstance(data, list) else [data]:
+        spec = specs.setdefault(entry["name"], DatasetSpec(entry["name"]))
+        if entry.get("description"):
+            spec.description = entry["description"]
+        spec.examples.extend(_example_from_record(record) for record in entry.get("examples") or [])
+
+
+def load_specs(*paths):
+    """Read dataset specs from .jsonl/.yaml files or directories of them, keyed by dataset name"""
+    specs = {}
+    for path in paths or (DEFAULT_SPEC_DIR,):
+        path = Path(path)
+        files = sorted(path.iterdir()) if path.is_dir() else [path]
+        for file in files:
+            if file.suffix == ".jsonl":
+                _read_jsonl(file, specs)
+            elif file.suffix in (".yaml", ".yml"):
+                _read_yaml(file, specs)
+    return specs
+
+
+class RateLimiter:
+    """Token bucket shared by every worker thread; `rate` requests per second"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class SyncPlan:
+    dataset: str
+    dataset_id: str = None
+    creates: list = field(default_factory=list)
+    updates: list = field(default_factory=list)
+    deletes: list = field(default_factory=list)
+    unchanged: int = 0
+
+    def report(self):
+        return {
+            "created": len(self.creates),
+            "updated": len(self.updates),
+            "deleted": len(self.deletes),
+            "unchanged": self.unchanged,
+        }
+
+
+def _batched(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class DatasetSync:
+    """Reconcile LangSmith datasets with specs, touching only what changed.
+
+    Each spec example is matched to a remote example by its stable id, or by
+    identical inputs for examples created before ids were assigned. Examples
+    whose stored content hash differs are updated, missing ones are created
+    and, with `prune`, remote examples absent from the spec are deleted.
+    Writes are sent in batches of `batch_size` across `max_workers` threads,
+    throttled to `rate` requests per second and retried on transient errors.
+
+    `client` only needs the LangSmith `Client` methods used here, so a fake
+    can stand in for tests and benchmarks.
+    """
+
+    def __init__(self, client, max_workers=DEFAULT_MAX_WORKERS, batch_size=DEFAULT_BATCH_SIZE,
+                 rate=DEFAULT_RATE, retries=DEFAULT_RETRIES, prune=True, dry_run=False):
+        self.client = client
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.prune = prune
+        self.dry_run = dry_run
+        self.requests = 0
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def _call(self, fn, *args, **kwargs):
+        """Call the API through the rate limiter, retrying transient failures"""
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            with self._lock:
+                self.requests += 1
+            try:
+                return fn(*args, **kwargs)
+            except RETRYABLE_ERRORS:
+                if attempt == self.retries:
+                    raise
+                with self._lock:
+                    self.retried += 1
+                time.sleep(RETRY_BACKOFF_S * 2 ** attempt)
+
+    def _dataset_id(self, spec):
+        if self._call(self.client.has_dataset, dataset_name=spec.name):
+            return str(self._call(self.client.read_dataset, dataset_name=spec.name).id)
+        if self.dry_run:
+            return None
+        dataset = self._call(self.client.create_dataset, spec.name, description=spec.description)
+        return str(dataset.id)
+
+    def plan(self, spec):
+        """Work out the creates, updates and deletes that bring one dataset in line with its spec"""
+        plan = SyncPlan(spec.name, self._dataset_id(spec))
+        remote = {}
+        if plan.dataset_id is not None:
+            remote = {
+                str(example.id): example
+                for example in self._call(lambda: list(self.client.list_examples(dataset_id=plan.dataset_id)))
+            }
+        by_inputs = {_hash(example.inputs): example_id for example_id, example in remote.items()}
+        # Without an id, an example whose inputs change is matched by nothing
+        # and is replaced, losing its run history and feedback
+        unnamed = sum(1 for example in spec.examples if not example.id)
+        if unnamed:
+            print(f"Warning: {unnamed} example(s) in {spec.name!r} have no 'id'; "
+                  "editing their inputs will replace them")
+
+        matched = set()
+        for example in spec.examples:
+            example_id = example.key(spec.name)
+            if example_id not in remote:
+                example_id = by_inputs.get(_hash(example.inputs), example_id)
+            if example_id in matched:
+                raise ValueError(f"{spec.name}: duplicate example {example_id}")
+            matched.add(example_id)
+            content_hash = example.content_hash()
+            payload = {
+                "id": example_id,
+                "inputs": example.inputs,
+                "outputs": example.outputs,
+                "metadata": {**(example.metadata or {}), HASH_KEY: content_hash},
+            }
+            current = remote.get(example_id)
+            if current is None:
+                plan.creates.append(payload)
+            elif (current.metadata or {}).get(HASH_KEY) != content_hash:
+                # Updates replace the metadata, so keep keys set elsewhere
+                # (dataset_split, edits made in the UI)
+                payload["metadata"] = {**(current.metadata or {}), **payload["metadata"]}
+                plan.updates.append(payload)
+            else:
+                plan.unchanged += 1
+        if self.prune:
+            plan.deletes = [example_id for example_id in remote if example_id not in matched]
+        return plan
+
+    def _create(self, plan, batch):
+        self._call(self.client.create_examples, dataset_id=plan.dataset_id, examples=batch)
+
+    def _update(self, plan, batch):
+        self._call(self.client.update_examples, dataset_id=plan.dataset_id, updates=batch)
+
+    def _delete(self, plan, batch):
+        if hasattr(self.client, "delete_examples"):
+            self._call(self.client.delete_examples, batch)
+        else:
+            for example_id in batch:
+                self._call(self.client.delete_example, example_id)
+
+    def sync(self, specs):
+        """Sync every spec concurrently; returns a per-dataset report"""
+        specs = list(specs.values()) if isinstance(specs, dict) else list(specs)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            plans = list(executor.map(self.plan, specs))
+            if not self.dry_run:
+                futures = [
+                    executor.submit(apply, plan, batch)
+                    for plan in plans
+                    for apply, items in (
+                        (self._create, plan.creates),
+                        (self._update, plan.updates),
+                        (self._delete, plan.deletes),
+                    )
+                    for batch in _batched(items, self.batch_size)
+                ]
+                for future in futures:
+                    future.result()
+        return {plan.dataset: plan.report() for plan in plans}
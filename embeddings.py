@@ -0,0 +1,187 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = Path(os.getenv("EMBEDDING_CACHE_DIR", PROJECT_ROOT / ".cache" / "embeddings"))
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "512"))
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+OPENAI_EMBEDDING_DIMENSIONS = 1536
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class Embedder:
+    """Interface for client-side embedders.
+
+    Subclasses set `model` and `dimensions` and implement `embed_documents`.
+    """
+
+    model = None
+    dimensions = None
+
+    def embed_documents(self, texts):
+        """Embed a batch of texts, returning a float32 array of shape (n, dimensions)"""
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        """Embed a single query"""
+        return self.embed_documents([text])[0]
+
+
+class OpenAIEmbedder(Embedder):
+    """OpenAI embeddings, matching the model the collection vectorizes with"""
+
+    def __init__(self, model=OPENAI_EMBEDDING_MODEL, dimensions=OPENAI_EMBEDDING_DIMENSIONS):
+        from langchain_openai import OpenAIEmbeddings
+
+        self.model = model
+        self.dimensions = dimensions
+        self._embeddings = OpenAIEmbeddings(model=model)
+
+    def embed_documents(self, texts):
+        return np.asarray(self._embeddings.embed_documents(list(texts)), dtype=np.float32)
+
+    def embed_query(self, text):
+        return np.asarray(self._embeddings.embed_query(text), dtype=np.float32)
+
+
+class HashEmbedder(Embedder):
+    """Deterministic, offline embedder based on feature hashing of word tokens.
+
+    Vectors carry enough lexical signal for tests and benchmarks, and texts
+    sharing words land close together under cosine similarity.
+    """
+
+    def __init__(self, dimensions=OPENAI_EMBEDDING_DIMENSIONS):
+        self.model = f"local-hash-{dimensions}"
+        self.dimensions = dimensions
+
+    def _embed(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimensions] += sign
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.stack([self._embed(text) for text in texts])
+
+
+def get_embedder(name):
+    """Resolve an embedder by name: "openai", "local", or "server"/None for none"""
+    if name in (None, "", "server"):
+        return None
+    if name == "openai":
+        return OpenAIEmbedder()
+    if name == "local":
+        return HashEmbedder()
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+class EmbeddingCache:
+    """Append-only on-disk vector store keyed by chunk hash, one per model.
+
+    Vectors live in a raw float32 file that is memory-mapped for reads, and
+    the matching keys are appended, one per line, to a sidecar file; a key's
+    line number is its row in the vector file.
+    """
+
+    def __init__(self, model, dimensions, cache_dir=DEFAULT_CACHE_DIR):
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.dimensions = dimensions
+        self.directory = Path(cache_dir) / f"{slug}-{dimensions}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.f32"
+        self.keys_path = self.directory / "keys.txt"
+        self._rows = {}
+        self._vectors = None
+        self._load()
+
+    def _load(self):
+        keys = []
+        if self.keys_path.exists():
+            keys = self.keys_path.read_text(encoding="utf-8").split()
+        row_bytes = self.dimensions * 4
+        stored_rows = self.vectors_path.stat().st_size // row_bytes if self.vectors_path.exists() else 0
+        # Keys are written after vectors, so an interrupted append leaves at
+        # most some unreferenced trailing vectors, which are ignored.
+        count = min(len(keys), stored_rows)
+        self._rows = {key: row for row, key in enumerate(keys[:count])}
+        self._vectors = None
+        if count:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                      shape=(count, self.dimensions))
+        if len(keys) != count or stored_rows != count:
+            self._truncate(keys[:count], count)
+
+    def _truncate(self, keys, count):
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(count * self.dimensions * 4)
+        self.keys_path.write_text("".join(f"{key}\n" for key in keys), encoding="utf-8")
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys present in the cache"""
+        return {key: np.array(self._vectors[self._rows[key]]) for key in keys if key in self._rows}
+
+    def put_many(self, keys, vectors):
+        """Append new vectors; keys already present are skipped"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._rows]
+        # Drop duplicates within the same call, keeping the first occurrence
+        seen = set()
+        new = [(key, vector) for key, vector in new if not (key in seen or seen.add(key))]
+        if not new:
+            return
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.stack([vector for _, vector in new]).tobytes())
+        with open(self.keys_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{key}\n" for key, _ in new))
+        for key, _ in new:
+            self._rows[key] = len(self._rows)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                  shape=(len(self._rows), self.dimensions))
+
+
+def embed_with_cache(texts, keys, embedder, cache=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Embed texts in large batches, reusing cached vectors by key.
+
+    Returns (vectors, hits): a float32 array aligned with `texts` and the number
+    of vectors served from the cache.
+    """
+    texts, keys = list(texts), list(keys)
+    if cache is None:
+        cache = EmbeddingCache(embedder.model, embedder.dimensions)
+    found = cache.get_many(keys)
+    hits = sum(1 for key in keys if key in found)
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+    missing_keys = list(missing)
+    for start in range(0, len(missing_keys), batch_size):
+        batch_keys = missing_keys[start:start + batch_size]
+        vectors = embedder.embed_documents([missing[key] for key in batch_keys])
+        cache.put_many(batch_keys, vectors)
+        found.update(zip(batch_keys, np.asarray(vectors, dtype=np.float32)))
+
+    result = np.zeros((len(keys), embedder.dimensions), dtype=np.float32)
+    for i, key in enumerate(keys):
+        result[i] = found[key]
+    return result, hits
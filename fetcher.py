@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+from index_manifest import atomic_write, content_hash
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = Path(os.getenv("FETCH_CACHE_DIR", PROJECT_ROOT / ".cache" / "http"))
+DEFAULT_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+DEFAULT_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "30"))
+
+USER_AGENT = "langsmith-debug-fetcher/1.0"
+
+
+class HTTPCache:
+    """Disk-backed cache of page bodies keyed by URL.
+
+    Each entry is a pair of files: the raw body and a small JSON sidecar with
+    the validators (ETag / Last-Modified) needed for conditional requests.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url):
+        key = content_hash(url)
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def get(self, url):
+        """Return (meta, body) for a cached URL, or None"""
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def conditional_headers(self, url):
+        """Build If-None-Match / If-Modified-Since headers for a cached URL"""
+        entry = self.get(url)
+        if entry is None:
+            return {}
+        meta, _ = entry
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def put(self, url, body, response_headers, encoding=None):
+        """Store a body together with its validators"""
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "encoding": encoding,
+        }
+        atomic_write(body_path, body)
+        atomic_write(meta_path, json.dumps(meta))
+
+
+class FetchResult:
+    """A fetched page, where it came from and when it was fetched (perf_counter times)"""
+
+    def __init__(self, url, html, from_cache, started=None, finished=None):
+        self.url = url
+        self.html = html
+        self.from_cache = from_cache
+        self.started = started
+        self.finished = finished
+
+
+_local = threading.local()
+
+
+def _get_session(pool_size):
+    # requests.Session is not guaranteed to be thread-safe, so keep one per worker
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        _local.session = session
+    return session
+
+
+def _decode(body, encoding):
+    return body.decode(encoding or "utf-8", errors="replace")
+
+
+def fetch_url(url, cache, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_MAX_WORKERS):
+    """Fetch one URL, revalidating against the cache when possible"""
+    started = time.perf_counter()
+    session = _get_session(pool_size)
+    headers = cache.conditional_headers(url)
+
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            entry = cache.get(url)
+            if entry is not None:
+                meta, body = entry
+                return FetchResult(url, _decode(body, meta.get("encoding")), True, started, time.perf_counter())
+            # The cached copy went missing after revalidation; fetch the page in full
+            response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        entry = cache.get(url)
+        if entry is None:
+            raise
+        print(f"Warning: fetching {url} failed ({e}); using cached copy")
+        meta, body = entry
+        return FetchResult(url, _decode(body, meta.get("encoding")), True, started, time.perf_counter())
+
+    # Like WebBaseLoader (autoset_encoding), decode with the detected encoding
+    # rather than requests' ISO-8859-1 default for text/html without a charset
+    encoding = response.apparent_encoding
+    cache.put(url, response.content, response.headers, encoding=encoding)
+    return FetchResult(url, _decode(response.content, encoding), False, started, time.perf_counter())
+
+
+def html_to_document(url, html):
+    """Convert a page to a Document the same way WebBaseLoader does"""
+    soup = BeautifulSoup(html, "html.parser")
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if html_tag := soup.find("html"):
+        metadata["language"] = html_tag.get("lang", "No language found.")
+    return Document(page_content=soup.get_text(), metadata=metadata)
+
+
+def fetch_pages(urls, max_workers=DEFAULT_MAX_WORKERS, cache_dir=DEFAULT_CACHE_DIR,
+                timeout=DEFAULT_TIMEOUT, prefetch=None):
+    """Fetch many URLs concurrently, yielding FetchResults in input order.
+
+    At most `prefetch` pages (default twice the worker count) are in flight or
+    waiting to be consumed, so a slow consumer throttles fetching.
+    """
+    cache = HTTPCache(cache_dir)
+    prefetch = prefetch or 2 * max_workers
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for url in urls:
+            pending.append(executor.submit(fetch_url, url, cache, timeout, max_workers))
+            if len(pending) >= prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_documents(urls, max_workers=DEFAULT_MAX_WORKERS, cache_dir=DEFAULT_CACHE_DIR,
+                   timeout=DEFAULT_TIMEOUT, recorder=None):
+    """Fetch and parse URLs into Documents as they arrive, preserving input order.
+
+    With a RunRecorder, each page is recorded as a "fetch" span.
+    """
+    fetched = cached = 0
+    for result in fetch_pages(urls, max_workers=max_workers, cache_dir=cache_dir, timeout=timeout):
+        fetched += 1
+        cached += result.from_cache
+        if recorder is not None:
+            recorder.record_span("fetch", result.started, result.finished, url=result.url,
+                                 from_cache=result.from_cache, chars=len(result.html))
+            recorder.increment("pages_cached" if result.from_cache else "pages_downloaded")
+        yield html_to_document(result.url, result.html)
+    print(f"Fetched {fetched} pages ({cached} unchanged, served from cache)")
@@ -0,0 +1,44 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class JSONRequestHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler base for the small local JSON services and stand-ins"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs
+    # add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def read_json(self):
+        """The request body parsed as JSON, or None if it is not valid JSON"""
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class BackgroundServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Replays open many connections at once; the default backlog of 5 drops them
+    request_queue_size = 1024
+
+
+def serve_in_background(handler, host="127.0.0.1", port=0):
+    """Start a threaded server for `handler` on a daemon thread and return it"""
+    server = BackgroundServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
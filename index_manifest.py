@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_MANIFEST_PATH = Path(
+    os.getenv("INDEX_MANIFEST_PATH", PROJECT_ROOT / ".cache" / "index_manifest.json")
+)
+
+
+def content_hash(data):
+    """Stable SHA-256 hex digest of text (hashed as UTF-8) or bytes; the key for every on-disk cache"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def properties_hash(properties):
+    """Stable hash of an object's properties, used to detect metadata changes"""
+    return content_hash(json.dumps(properties, sort_keys=True, ensure_ascii=False))
+
+
+@contextmanager
+def atomic_file(path, mode="w"):
+    """Open a temp file beside `path` that replaces it only once the block completes.
+
+    Readers see either the old file or the new one, never a torn write; the
+    temp name carries the pid and thread id so concurrent writers don't clash.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open(mode, encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, path)
+
+
+def atomic_write(path, data):
+    """Atomically replace `path` with `data` (str is written as UTF-8)"""
+    with atomic_file(path, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+
+
+def chunk_uuid(source, text, occurrence=0):
+    """Deterministic object UUID from the source URL and the chunk content hash.
+
+    `occurrence` disambiguates identical chunks repeated within one page.
+    """
+    # Imported here so the fetch and split workers can use the helpers above
+    # without paying for the Weaviate client import
+    from weaviate.util import generate_uuid5
+
+    return generate_uuid5(f"{source}|{content_hash(text)}|{occurrence}")
+
+
+class IndexManifest:
+    """Local record of which chunk UUIDs have been indexed into a collection.
+
+    The manifest file holds one section per (Weaviate URL, collection) so that
+    pointing at a different cluster never reuses another cluster's state.
+    Each section maps UUID -> properties hash, plus a `generation` counter that
+    is bumped whenever the indexed contents change, and the `vectorizer` that
+    produced the stored vectors ("server" or the client-side embedder model).
+    """
+
+    def __init__(self, key, path=DEFAULT_MANIFEST_PATH):
+        self.key = key
+        self.path = Path(path)
+        self.objects = {}
+        self.generation = 0
+        self.updated_at = None
+        self.vectorizer = None
+        self._revectorize = False
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        section = data.get(self.key, {})
+        self.objects = section.get("objects", {})
+        self.generation = section.get("generation", 0)
+        self.updated_at = section.get("updated_at")
+        self.vectorizer = section.get("vectorizer")
+
+    def reset(self, objects=None):
+        """Replace the recorded objects, e.g. after a rebuild or a reconcile"""
+        self.objects = dict(objects or {})
+
+    def use_vectorizer(self, vectorizer):
+        """Record the vectorizer for this run; if it differs, every object is re-uploaded.
+
+        Mixing vectors from different models in one collection makes
+        similarity scores meaningless, so a change (or an unknown previous
+        vectorizer) marks all recorded objects as needing an update.
+        """
+        self._revectorize = bool(self.objects) and self.vectorizer != vectorizer
+        self.vectorizer = vectorizer
+        return self._revectorize
+
+    def classify(self, uuid, properties):
+        """Return "insert", "update" or None (unchanged) for a desired object.
+
+        A recorded hash of None means the entry was recovered from the server
+        without properties; since the UUID already encodes the content, such
+        entries are treated as up to date unless the vectorizer changed.
+        """
+        if uuid not in self.objects:
+            return "insert"
+        if self._revectorize:
+            return "update"
+        recorded = self.objects[uuid]
+        if recorded is not None and recorded != properties_hash(properties):
+            return "update"
+        return None
+
+    def stale(self, seen):
+        """UUIDs recorded in the manifest but absent from `seen`"""
+        return [uuid for uuid in self.objects if uuid not in seen]
+
+    def save(self, changed=True):
+        """Write this section back, bumping the generation if anything changed"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        self._revectorize = False
+        if changed:
+            self.generation += 1
+            self.updated_at = time.time()
+        data[self.key] = {
+            "generation": self.generation,
+            "updated_at": self.updated_at,
+            "vectorizer": self.vectorizer,
+            "objects": self.objects,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, json.dumps(data))
+
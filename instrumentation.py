@@ -0,0 +1,163 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from metrics import summarize
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_REPORT_DIR = Path(os.getenv("INGEST_REPORT_DIR", PROJECT_ROOT / ".cache" / "reports"))
+
+
+class StageTimer:
+    """Accumulates the time each generator stage spends producing items.
+
+    Times are inclusive of upstream stages, since pulling from a stage pulls
+    from everything before it; `exclusive()` subtracts them back out.
+    """
+
+    def __init__(self):
+        self.inclusive = defaultdict(float)
+
+    def wrap(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.inclusive[name] += time.perf_counter() - start
+                return
+            self.inclusive[name] += time.perf_counter() - start
+            yield item
+
+    def exclusive(self, order):
+        result, upstream = {}, 0.0
+        for name in order:
+            result[name] = self.inclusive[name] - upstream
+            upstream = self.inclusive[name]
+        return result
+
+
+class RunRecorder:
+    """Collects spans, counters and batch sizes for one ingestion run.
+
+    Span times are taken from `time.perf_counter()` and converted to wall
+    clock time relative to when the recorder was created.
+    """
+
+    def __init__(self, name="ingest"):
+        self.name = name
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.counters = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.batch_sizes = []
+        self.stages = StageTimer()
+
+    def record_span(self, name, started, finished, error=None, **attributes):
+        """Record a span from two perf_counter() readings"""
+        self.spans.append({
+            "name": name,
+            "start_s": round(started - self._t0, 6),
+            "duration_s": round(finished - started, 6),
+            "error": error,
+            "attributes": attributes,
+        })
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a block; the yielded dict can be filled with more attributes"""
+        started = time.perf_counter()
+        try:
+            yield attributes
+        except Exception as e:
+            self.record_span(name, started, time.perf_counter(), error=repr(e), **attributes)
+            raise
+        self.record_span(name, started, time.perf_counter(), **attributes)
+
+    def increment(self, name, value=1):
+        self.counters[name] += value
+
+    def record_error(self, message):
+        self.errors[message] += 1
+
+    def record_batch_size(self, size):
+        """Note the dynamic batcher's batch size, keeping only changes"""
+        if size is None:
+            return
+        if not self.batch_sizes or self.batch_sizes[-1]["size"] != size:
+            self.batch_sizes.append({"at_s": round(time.perf_counter() - self._t0, 3), "size": size})
+
+    def stage_summary(self):
+        """Per span name: count, total and latency percentiles in seconds"""
+        durations = defaultdict(list)
+        for span in self.spans:
+            durations[span["name"]].append(span["duration_s"])
+        return {
+            name: {"total_s": round(sum(values), 3), **summarize(values)}
+            for name, values in durations.items()
+        }
+
+    def report(self, summary=None, stage_order=None):
+        """The run as a JSON-serializable dict"""
+        return {
+            "name": self.name,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "elapsed_s": round(time.perf_counter() - self._t0, 3),
+            "summary": summary or {},
+            "counters": dict(self.counters),
+            "errors": dict(self.errors),
+            "stage_time_s": {
+                name: round(seconds, 3)
+                for name, seconds in self.stages.exclusive(stage_order or list(self.stages.inclusive)).items()
+            },
+            "spans_by_name": self.stage_summary(),
+            "batch_sizes": self.batch_sizes,
+            "spans": self.spans,
+        }
+
+    def write(self, report, path=None):
+        """Write a report to `path` (default: a timestamped file in INGEST_REPORT_DIR)"""
+        if path is None:
+            stamp = datetime.fromtimestamp(self.started_at, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            path = DEFAULT_REPORT_DIR / f"{self.name}-{stamp}.json"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return path
+
+
+def export_to_langsmith(recorder, report, project_name=None):
+    """Emit the run as a LangSmith trace: one root run with a child run per span"""
+    from langsmith import RunTree
+
+    def wall(offset):
+        return datetime.fromtimestamp(recorder.started_at + offset, timezone.utc)
+
+    root = RunTree(
+        name=recorder.name,
+        run_type="chain",
+        inputs={"counters": report["counters"]},
+        start_time=wall(0),
+        project_name=project_name or os.getenv("LANGSMITH_PROJECT", "langsmith-debug"),
+    )
+    for span in recorder.spans:
+        child = root.create_child(
+            name=span["name"],
+            run_type="tool",
+            inputs=span["attributes"],
+            start_time=wall(span["start_s"]),
+        )
+        child.end(
+            outputs={"duration_s": span["duration_s"]},
+            error=span["error"],
+            end_time=wall(span["start_s"] + span["duration_s"]),
+        )
+    root.end(outputs=report["summary"], end_time=wall(report["elapsed_s"]))
+    root.post(exclude_child_runs=False)
+    return root
@@ -0,0 +1,306 @@
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from index_manifest import atomic_file, atomic_write
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", PROJECT_ROOT / ".cache" / "local_index"))
+# Above this many rows, vector search goes through an IVF index instead of a full scan
+DEFAULT_IVF_THRESHOLD = int(os.getenv("LOCAL_INDEX_IVF_THRESHOLD", "50000"))
+DEFAULT_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "8"))
+# Weaviate's hybrid default: 1.0 is pure vector search, 0.0 pure BM25
+DEFAULT_ALPHA = 0.75
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TEXT_PROPERTIES = ("content", "title")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _top_k(scores, limit):
+    """Indices of the `limit` highest finite scores, best first"""
+    limit = min(limit, int(np.isfinite(scores).sum()))
+    if limit <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    return top[np.argsort(-scores[top])]
+
+
+def _relative_scores(scores):
+    """Min-max normalize a {row: score} dict to [0, 1], as Weaviate's relativeScoreFusion does"""
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    if high == low:
+        return {row: 1.0 for row in scores}
+    return {row: (score - low) / (high - low) for row, score in scores.items()}
+
+
+class _IVF:
+    """Inverted-file index over the first `size` rows: k-means centroids plus
+    each row's list assignment, stored sorted so a list is a contiguous slice."""
+
+    def __init__(self, centroids, order, offsets, size):
+        self.centroids = centroids
+        self.order = order
+        self.offsets = offsets
+        self.size = size
+
+    @classmethod
+    def build(cls, vectors, iterations=10, sample_size=100000, seed=0):
+        size = len(vectors)
+        nlist = max(1, min(4096, int(math.sqrt(size))))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(size, size=min(size, sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for i in range(nlist):
+                members = sample[assignment == i]
+                if len(members):
+                    centroids[i] = _normalize(members.mean(axis=0))
+        assignment = np.concatenate([
+            np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+            for start in range(0, size, 65536)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(nlist + 1))
+        return cls(centroids, order, offsets, size)
+
+    def candidates(self, query, nprobe):
+        nearest = np.argsort(-(self.centroids @ query))[:nprobe]
+        return np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in nearest])
+
+
+class LocalIndex:
+    """In-process vector + BM25 index with the LangGraphDocs properties.
+
+    Vectors are kept L2-normalized so cosine similarity is a dot product.
+    Small indexes are searched by brute force; past `ivf_threshold` rows an
+    IVF index is built lazily and rows added since the last build are
+    scanned directly. Updates and deletes tombstone rows, which `save()`
+    compacts away. On disk, vectors are a raw float32 file that is
+    memory-mapped on load, next to a JSONL file of UUIDs and properties.
+    """
+
+    def __init__(self, directory=DEFAULT_INDEX_DIR, ivf_threshold=DEFAULT_IVF_THRESHOLD,
+                 nprobe=DEFAULT_NPROBE):
+        self.directory = Path(directory)
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.dimensions = None
+        self.uuids = []
+        self.properties = []
+        self.row_of = {}
+        self._vectors = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._ivf = None
+        self._bm25 = None
+        self.load()
+
+    @property
+    def _paths(self):
+        return (self.directory / "meta.json", self.directory / "vectors.f32",
+                self.directory / "objects.jsonl")
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def load(self):
+        """Load a saved index, memory-mapping its vectors"""
+        meta_path, vectors_path, objects_path = self._paths
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        self.dimensions = meta["dimensions"]
+        self._size = meta["count"]
+        self.uuids, self.properties = [], []
+        with objects_path.open(encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                self.uuids.append(record["uuid"])
+                self.properties.append(record["properties"])
+        self.row_of = {uuid: row for row, uuid in enumerate(self.uuids)}
+        self._alive = np.ones(self._size, dtype=bool)
+        self._vectors = None
+        if self._size:
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r",
+                                      shape=(self._size, self.dimensions))
+        self._ivf = None
+        self._bm25 = None
+
+    def clear(self):
+        """Remove every object"""
+        self.dimensions = None
+        self.uuids, self.properties, self.row_of = [], [], {}
+        self._vectors = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._ivf = None
+        self._bm25 = None
+
+    def _reserve(self, rows):
+        # Grow an in-memory copy geometrically; the first write detaches
+        # from the read-only memory map
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        writable = isinstance(self._vectors, np.ndarray) and not isinstance(self._vectors, np.memmap)
+        if writable and self._size + rows <= capacity:
+            return
+        new_capacity = max(self._size + rows, 2 * capacity, 1024)
+        vectors = np.zeros((new_capacity, self.dimensions), dtype=np.float32)
+        alive = np.zeros(new_capacity, dtype=bool)
+        if self._size:
+            vectors[:self._size] = self._vectors[:self._size]
+            alive[:self._size] = self._alive[:self._size]
+        self._vectors, self._alive = vectors, alive
+
+    def upsert(self, uuid, properties, vector):
+        """Insert or replace one object"""
+        if vector is None:
+            raise ValueError("LocalIndex needs a vector for every object; ingest with a client-side embedder")
+        vector = _normalize(vector)
+        if self.dimensions is None:
+            self.dimensions = len(vector)
+        elif len(vector) != self.dimensions:
+            raise ValueError(f"Expected a {self.dimensions}-dimensional vector, got {len(vector)}")
+        if uuid in self.row_of:
+            self._alive[self.row_of[uuid]] = False
+        self._reserve(1)
+        row = self._size
+        self._vectors[row] = vector
+        self._alive[row] = True
+        self._size += 1
+        self.uuids.append(uuid)
+        self.properties.append(dict(properties))
+        self.row_of[uuid] = row
+        self._bm25 = None
+
+    def delete(self, uuids):
+        """Delete objects by UUID; unknown UUIDs are ignored"""
+        for uuid in uuids:
+            row = self.row_of.pop(uuid, None)
+            if row is not None:
+                self._alive[row] = False
+        self._bm25 = None
+
+    def save(self):
+        """Compact tombstoned rows and write the index to disk"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, vectors_path, objects_path = self._paths
+        alive_rows = np.flatnonzero(self._alive[:self._size])
+        # Both files are swapped in only after both are fully written
+        with atomic_file(vectors_path, "wb") as vectors_file, atomic_file(objects_path) as objects_file:
+            for start in range(0, len(alive_rows), 65536):
+                vectors_file.write(np.ascontiguousarray(self._vectors[alive_rows[start:start + 65536]]).tobytes())
+            for row in alive_rows:
+                objects_file.write(json.dumps({"uuid": self.uuids[row], "properties": self.properties[row]},
+                                              ensure_ascii=False) + "\n")
+        atomic_write(meta_path, json.dumps({"dimensions": self.dimensions, "count": len(alive_rows)}))
+        self.load()
+
+    def _vector_scores(self, query_vector, limit):
+        """{row: cosine similarity} for the best `limit` live rows"""
+        if not self._size:
+            return {}
+        query = _normalize(query_vector)
+        alive = self._alive[:self._size]
+        if self._size > self.ivf_threshold:
+            if self._ivf is None or self._size - self._ivf.size > 0.1 * self._ivf.size:
+                self._ivf = _IVF.build(self._vectors[:self._size])
+            rows = np.concatenate([
+                self._ivf.candidates(query, self.nprobe),
+                np.arange(self._ivf.size, self._size),
+            ])
+            rows = rows[alive[rows]]
+            scores = self._vectors[rows] @ query
+            top = _top_k(scores, limit)
+            return {int(rows[i]): float(scores[i]) for i in top}
+        scores = np.asarray(self._vectors[:self._size] @ query, dtype=np.float32)
+        scores[~alive] = -np.inf
+        return {int(i): float(scores[i]) for i in _top_k(scores, limit)}
+
+    def _build_bm25(self):
+        postings = defaultdict(list)
+        lengths = np.zeros(self._size, dtype=np.float32)
+        alive = self._alive[:self._size]
+        for row in np.flatnonzero(alive):
+            properties = self.properties[row]
+            tokens = tokenize(" ".join(str(properties.get(name, "")) for name in TEXT_PROPERTIES))
+            lengths[row] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                postings[term].append((row, tf))
+        count = int(alive.sum())
+        average = float(lengths.sum() / count) if count else 0.0
+        self._bm25 = (
+            {term: (np.array([r for r, _ in rows]), np.array([tf for _, tf in rows], dtype=np.float32))
+             for term, rows in postings.items()},
+            lengths, average, count,
+        )
+
+    def _bm25_scores(self, query_text, limit):
+        """{row: BM25 score} for the best `limit` matching rows"""
+        if not self._size:
+            return {}
+        if self._bm25 is None:
+            self._build_bm25()
+        postings, lengths, average, count = self._bm25
+        scores = np.zeros(self._size, dtype=np.float32)
+        for term in set(tokenize(query_text)):
+            if term not in postings:
+                continue
+            rows, tf = postings[term]
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows] / (average or 1.0))
+            scores[rows] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        scores[scores <= 0] = -np.inf
+        return {int(i): float(scores[i]) for i in _top_k(scores, limit)}
+
+    def _results(self, scored, distance=False):
+        return [
+            {
+                "uuid": self.uuids[row],
+                "properties": self.properties[row],
+                "score": None if distance else score,
+                "distance": 1.0 - score if distance else None,
+            }
+            for row, score in scored
+        ]
+
+    def search_vector(self, query_vector, limit=5):
+        """Nearest neighbours by cosine distance"""
+        scores = self._vector_scores(query_vector, limit)
+        return self._results(sorted(scores.items(), key=lambda item: -item[1]), distance=True)
+
+    def search_bm25(self, query_text, limit=5):
+        """Keyword search over content and title"""
+        scores = self._bm25_scores(query_text, limit)
+        return self._results(sorted(scores.items(), key=lambda item: -item[1]))
+
+    def search_hybrid(self, query_text, query_vector, limit=5, alpha=DEFAULT_ALPHA):
+        """Fuse vector and BM25 results with relative score fusion"""
+        candidates = max(limit, 100)
+        vector = _relative_scores(self._vector_scores(query_vector, candidates))
+        keyword = _relative_scores(self._bm25_scores(query_text, candidates))
+        fused = {
+            row: alpha * vector.get(row, 0.0) + (1 - alpha) * keyword.get(row, 0.0)
+            for row in vector.keys() | keyword.keys()
+        }
+        return self._results(sorted(fused.items(), key=lambda item: -item[1])[:limit])
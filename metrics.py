@@ -0,0 +1,61 @@
+import math
+import random
+import threading
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` for q in [0, 100], or None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values, scale=1.0, digits=3):
+    """Count, mean and p50/p95/p99 of `values`, multiplied by `scale`"""
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values) * scale, digits),
+        "p50": round(percentile(values, 50) * scale, digits),
+        "p95": round(percentile(values, 95) * scale, digits),
+        "p99": round(percentile(values, 99) * scale, digits),
+    }
+
+
+class LatencyRecorder:
+    """Thread-safe latency sample with bounded memory.
+
+    Keeps a uniform reservoir of at most `capacity` samples, so percentiles
+    stay representative however many observations are recorded.
+    """
+
+    def __init__(self, capacity=10000, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.total = 0.0
+        self._samples = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            if len(self._samples) < self.capacity:
+                self._samples.append(value)
+            else:
+                slot = self._rng.randrange(self.count)
+                if slot < self.capacity:
+                    self._samples[slot] = value
+
+    def summary(self, scale=1.0, digits=3):
+        with self._lock:
+            samples = list(self._samples)
+            count, total = self.count, self.total
+        result = summarize(samples, scale=scale, digits=digits)
+        result["count"] = count
+        result["mean"] = round(total / count * scale, digits) if count else None
+        return result
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from dataset_sync import load_specs
+from embeddings import HashEmbedder
+from http_service import JSONRequestHandler, serve_in_background
+from retrieval_cache import normalize_query
+
+DEFAULT_HOST = os.getenv("PRECLASSIFIER_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("PRECLASSIFIER_PORT", "8765"))
+DEFAULT_THRESHOLD = float(os.getenv("PRECLASSIFIER_THRESHOLD", "0.9"))
+DEFAULT_MIN_SIMILARITY = float(os.getenv("PRECLASSIFIER_MIN_SIMILARITY", "0.6"))
+DEFAULT_CACHE_SIZE = int(os.getenv("PRECLASSIFIER_CACHE_SIZE", "10000"))
+FEATURE_DIMENSIONS = 2048
+
+# Categories of the "Guardrail Classifier" and "Text Classifier" nodes in
+# agents/guarded_adaptive.json
+DANGEROUS, SENSITIVE, BENIGN = "Dangerous", "Sensitive", "Benign"
+LANGCHAIN, NON_LANGCHAIN = "LangChain", "non-LangChain"
+
+# Guardrail and topic label of the questions in each dataset spec
+TRAINING_LABELS = {
+    "LangSmith Debugging: Guardrails": (DANGEROUS, None),
+    "LangSmith Debugging: Adaptive Search": (BENIGN, NON_LANGCHAIN),
+    "LangSmith Debugging: Basic Search": (BENIGN, LANGCHAIN),
+}
+
+# The Text Classifier's LangChain category is defined by these names
+LANGCHAIN_TERMS = re.compile(r"\blang\s?(chain|graph|smith)\b", re.IGNORECASE)
+
+
+def training_examples(specs=None):
+    """(question, guardrail label, topic label) for every labelled dataset spec"""
+    specs = load_specs() if specs is None else specs
+    return [
+        (example.inputs["question"], *TRAINING_LABELS[name])
+        for name, spec in specs.items()
+        if name in TRAINING_LABELS
+        for example in spec.examples
+    ]
+
+
+class _SoftmaxHead:
+    """Multinomial logistic regression over fixed features, fit by gradient descent"""
+
+    def __init__(self, epochs=300, learning_rate=0.5, l2=1e-3):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.labels = []
+        self.weights = None
+
+    def fit(self, features, labels):
+        self.labels = sorted(set(labels))
+        targets = np.zeros((len(labels), len(self.labels)), dtype=np.float32)
+        targets[np.arange(len(labels)), [self.labels.index(label) for label in labels]] = 1
+        x = np.hstack([features, np.ones((len(features), 1), dtype=np.float32)])
+        self.weights = np.zeros((x.shape[1], len(self.labels)), dtype=np.float32)
+        for _ in range(self.epochs):
+            probabilities = self._softmax(x @ self.weights)
+            gradient = x.T @ (probabilities - targets) / len(x) + self.l2 * self.weights
+            self.weights -= self.learning_rate * gradient
+        return self
+
+    @staticmethod
+    def _softmax(logits):
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, feature):
+        """(label, probability) of the most likely class"""
+        if len(self.labels) == 1:
+            return self.labels[0], 1.0
+        probabilities = self._softmax(np.append(feature, 1.0) @ self.weights)
+        best = int(np.argmax(probabilities))
+        return self.labels[best], float(probabilities[best])
+
+
+class PreClassifier:
+    """Local stand-in for the guardrail and topic LLM classifiers.
+
+    It never lets a message past the guardrail: a hashed bag-of-words
+    model trained on a handful of questions cannot vouch that a message is
+    safe, so the LLM Guardrail Classifier still sees everything that is not
+    refused here.
+
+    `route` is "Dangerous" when the guardrail head is at least `threshold`
+    confident and the message is within `min_similarity` (cosine) of a
+    training example; the workflow then refuses without calling the LLM.
+    Otherwise it is None. `topic_route` ("LangChain" or "non-LangChain") is
+    only used after the LLM guardrail has passed the message as benign, and
+    replaces the Text Classifier call; it is given for explicit
+    LangChain/LangGraph/LangSmith mentions, or when the topic head is
+    `threshold` confident on an in-distribution message. Verdicts are
+    cached per normalized message.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, min_similarity=DEFAULT_MIN_SIMILARITY,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        self.threshold = threshold
+        self.min_similarity = min_similarity
+        self.cache_size = cache_size
+        self.featurizer = HashEmbedder(FEATURE_DIMENSIONS)
+        self.guardrail = _SoftmaxHead()
+        self.topic = _SoftmaxHead()
+        self._examples = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "cache_hits": 0, "confident": 0, "fallbacks": 0}
+
+    @classmethod
+    def from_specs(cls, specs=None, **kwargs):
+        return cls(**kwargs).fit(training_examples(specs))
+
+    def fit(self, examples):
+        texts, guardrail_labels, topic_labels = zip(*examples)
+        features = self.featurizer.embed_documents(texts)
+        self._examples = features
+        self.guardrail.fit(features, guardrail_labels)
+        topical = [i for i, label in enumerate(topic_labels) if label is not None]
+        self.topic.fit(features[topical], [topic_labels[i] for i in topical])
+        with self._lock:
+            self._cache.clear()
+        return self
+
+    def _predict(self, text):
+        feature = self.featurizer.embed_query(text)
+        similarity = float(np.max(self._examples @ feature)) if len(self._examples) else 0.0
+        guardrail, guardrail_confidence = self.guardrail.predict(feature)
+        named = LANGCHAIN_TERMS.search(text) is not None
+        if named:
+            topic, topic_confidence = LANGCHAIN, 1.0
+        else:
+            topic, topic_confidence = self.topic.predict(feature)
+
+        in_distribution = similarity >= self.min_similarity
+        route = topic_route = None
+        if in_distribution and guardrail == DANGEROUS and guardrail_confidence >= self.threshold:
+            route = DANGEROUS
+        elif topic_confidence >= self.threshold and (in_distribution or named):
+            topic_route = topic
+        return {
+            "route": route,
+            "topic_route": topic_route,
+            "confident": route is not None or topic_route is not None,
+            "guardrail": {"label": guardrail, "confidence": round(guardrail_confidence, 4)},
+            "topic": {"label": topic, "confidence": round(topic_confidence, 4)},
+            "similarity": round(similarity, 4),
+        }
+
+    def classify(self, text):
+        """The verdict for one message, from the cache when it was seen before"""
+        key = normalize_query(text)
+        with self._lock:
+            self.counts["requests"] += 1
+            verdict = self._cache.get(key)
+            cached = verdict is not None
+            if cached:
+                self._cache.move_to_end(key)
+                self.counts["cache_hits"] += 1
+        if not cached:
+            verdict = self._predict(text)
+            with self._lock:
+                self._cache[key] = verdict
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        with self._lock:
+            self.counts["confident" if verdict["confident"] else "fallbacks"] += 1
+        return {**verdict, "cached": cached}
+
+    def stats(self):
+        with self._lock:
+            return {**self.counts, "cache_entries": len(self._cache)}
+
+
+class _ClassifierHandler(JSONRequestHandler):
+    classifier = None
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            self.reply(404, {"message": "not found"})
+            return
+        self.reply(200, {"status": "ok", **self.classifier.stats()})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/classify":
+            self.reply(404, {"message": "not found"})
+            return
+        payload = self.read_json()
+        if not isinstance(payload, dict) or not isinstance(payload.get("chatInput"), str):
+            self.reply(400, {"message": "expected a JSON body with chatInput"})
+            return
+        start = time.perf_counter()
+        verdict = self.classifier.classify(payload["chatInput"])
+        # Echo the chat fields so the workflow can continue from this item
+        self.reply(200, {
+            "chatInput": payload["chatInput"],
+            "sessionId": payload.get("sessionId"),
+            **verdict,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+        })
+
+
+def start_server(classifier, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Serve POST /classify and GET /health from a background thread"""
+    handler = type("ClassifierHandler", (_ClassifierHandler,), {"classifier": classifier})
+    return serve_in_background(handler, host, port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the local guardrail and topic pre-classifier")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="use 0.0.0.0 to accept requests from the n8n container")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--min-similarity", type=float, default=DEFAULT_MIN_SIMILARITY)
+    parser.add_argument("--classify", metavar="TEXT", help="print the verdict for TEXT and exit")
+    args = parser.parse_args()
+
+    classifier = PreClassifier.from_specs(threshold=args.threshold, min_similarity=args.min_similarity)
+    if args.classify:
+        print(json.dumps(classifier.classify(args.classify), indent=2))
+    else:
+        server = start_server(classifier, args.host, args.port)
+        print(f"Pre-classifier listening on http://{args.host}:{server.server_port}/classify")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+from dataset_sync import load_specs
+from instrumentation import DEFAULT_REPORT_DIR
+from metrics import LatencyRecorder
+
+load_dotenv(".env")
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+AGENTS_DIR = PROJECT_ROOT / "agents"
+CHAT_TRIGGER = "@n8n/n8n-nodes-langchain.chatTrigger"
+DEFAULT_N8N_URL = os.getenv("N8N_URL", "http://localhost:5678")
+DEFAULT_CONCURRENCY = int(os.getenv("REPLAY_CONCURRENCY", "8"))
+DEFAULT_RATE = float(os.getenv("REPLAY_RATE", "0"))
+DEFAULT_TIMEOUT = float(os.getenv("REPLAY_TIMEOUT", "120"))
+
+
+@dataclass
+class Workflow:
+    slug: str
+    name: str
+    webhook_id: str
+    url: str = None
+
+
+def chat_url(base_url, webhook_id):
+    """The public chat webhook of a chatTrigger node"""
+    return f"{base_url.rstrip('/')}/webhook/{webhook_id}/chat"
+
+
+def load_workflows(paths=None, base_url=DEFAULT_N8N_URL):
+    """Workflows with a chatTrigger node, keyed by file stem"""
+    workflows = {}
+    for path in paths or sorted(AGENTS_DIR.glob("*.json")):
+        path = Path(path)
+        data = json.loads(path.read_text(encoding="utf-8"))
+        trigger = next((node for node in data["nodes"] if node["type"] == CHAT_TRIGGER), None)
+        if trigger is None:
+            continue
+        workflows[path.stem] = Workflow(
+            slug=path.stem,
+            name=data.get("name", path.stem),
+            webhook_id=trigger["webhookId"],
+            url=chat_url(base_url, trigger["webhookId"]),
+        )
+    return workflows
+
+
+def load_questions(*dataset_names):
+    """Dataset questions from the specs in dataset_specs/, optionally limited to some datasets"""
+    specs = load_specs()
+    names = dataset_names or list(specs)
+    return [example.inputs["question"] for name in names for example in specs[name].examples]
+
+
+class AsyncRateLimiter:
+    """Spaces requests `1 / rate` seconds apart; unlimited when rate is 0"""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.rate = rate
+        self._next = 0.0
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        wait = self._next - now
+        self._next = max(now, self._next) + 1 / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class WorkflowStats:
+    """Latency, error and throughput counters for one workflow"""
+
+    def __init__(self):
+        self.latency = LatencyRecorder()
+        self.ok = 0
+        self.errors = Counter()
+        self.first_start = None
+        self.last_end = None
+
+    def record(self, started, finished, error=None):
+        self.first_start = started if self.first_start is None else min(self.first_start, started)
+        self.last_end = finished if self.last_end is None else max(self.last_end, finished)
+        self.latency.record(finished - started)
+        if error is None:
+            self.ok += 1
+        else:
+            self.errors[error] += 1
+
+    def report(self):
+        requests = self.ok + sum(self.errors.values())
+        elapsed = (self.last_end - self.first_start) if requests else 0
+        return {
+            "requests": requests,
+            "ok": self.ok,
+            "error_rate": round(sum(self.errors.values()) / requests, 4) if requests else None,
+            "errors": dict(self.errors),
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+            "latency_ms": self.latency.summary(scale=1000),
+        }
+
+
+async def _send(client, workflow, question):
+    # A fresh sessionId per request keeps the memoryBufferWindow nodes from
+    # carrying history between replayed questions
+    payload = {"action": "sendMessage", "sessionId": uuid.uuid4().hex, "chatInput": question}
+    try:
+        response = await client.post(workflow.url, json=payload)
+    except httpx.HTTPError as e:
+        return payload, None, type(e).__name__
+    if not response.is_success:
+        return payload, None, f"HTTP {response.status_code}"
+    try:
+        output = response.json()["output"]
+    except (ValueError, KeyError, TypeError):
+        return payload, None, "invalid response"
+    return payload, output, None
+
+
+async def replay(workflows, questions, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                 repeat=1, timeout=DEFAULT_TIMEOUT, responses=None):
+    """Send every question to every workflow `repeat` times and report per workflow.
+
+    `concurrency` requests are kept in flight over one pooled client, started
+    no faster than `rate` per second overall. When `responses` is a list, one
+    record per request is appended to it.
+    """
+    stats = {workflow.slug: WorkflowStats() for workflow in workflows}
+    limiter = AsyncRateLimiter(rate)
+    jobs = ((workflow, question) for _ in range(repeat) for question in questions for workflow in workflows)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def worker(client):
+        # Workers share one job iterator, so at most `concurrency` jobs exist at a time
+        for workflow, question in jobs:
+            await limiter.acquire()
+            started = time.perf_counter()
+            payload, output, error = await _send(client, workflow, question)
+            finished = time.perf_counter()
+            stats[workflow.slug].record(started, finished, error)
+            if responses is not None:
+                responses.append({
+                    "workflow": workflow.slug,
+                    "session_id": payload["sessionId"],
+                    "question": question,
+                    "output": output,
+                    "error": error,
+                    "latency_ms": round((finished - started) * 1000, 3),
+                })
+
+    started_at = time.time()
+    start = time.perf_counter()
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total = sum(s.ok + sum(s.errors.values()) for s in stats.values())
+    return {
+        "started_at": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+        "elapsed_s": round(elapsed, 3),
+        "concurrency": concurrency,
+        "rate": rate or None,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "workflows": {
+            workflow.slug: {"name": workflow.name, "url": workflow.url, **stats[workflow.slug].report()}
+            for workflow in workflows
+        },
+    }
+
+
+def print_report(report):
+    print(f"{report['requests']} requests in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s, concurrency {report['concurrency']})")
+    for slug, result in report["workflows"].items():
+        latency = result["latency_ms"]
+        print(f"  {slug}: {result['ok']}/{result['requests']} ok, error rate {result['error_rate']}, "
+              f"{result['throughput_rps']} req/s, latency ms p50={latency['p50']} "
+              f"p95={latency['p95']} p99={latency['p99']}")
+        for error, count in result["errors"].items():
+            print(f"    {error}: {count}")
+
+
+def _parse_overrides(values, parser):
+    overrides = {}
+    for value in values:
+        slug, sep, url = value.partition("=")
+        if not sep:
+            parser.error(f"--url expects workflow=URL, got {value!r}")
+        overrides[slug] = url
+    return overrides
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay dataset questions against the n8n chat workflows")
+    parser.add_argument(
+        "--workflow", action="append", default=[],
+        help="workflow to replay, by file stem in agents/ (default: all); repeatable",
+    )
+    parser.add_argument("--base-url", default=DEFAULT_N8N_URL, help="n8n base URL (env N8N_URL)")
+    parser.add_argument(
+        "--url", action="append", default=[], metavar="WORKFLOW=URL",
+        help="chat webhook URL for one workflow; repeatable",
+    )
+    parser.add_argument(
+        "--dataset", action="append", default=[],
+        help="dataset whose questions are sent (default: all); repeatable",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="times each question is sent to each workflow")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="max requests per second, 0 for unlimited")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per-request timeout in seconds")
+    parser.add_argument(
+        "--mock", action="store_true",
+        help="replay against a local mock webhook server instead of n8n",
+    )
+    parser.add_argument("--mock-latency-ms", type=float, default=200.0)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="report path (default: a timestamped file in INGEST_REPORT_DIR)")
+    parser.add_argument("--responses", help="also write one JSON line per request to this file")
+    args = parser.parse_args()
+
+    overrides = _parse_overrides(args.url, parser)
+    if args.mock:
+        from benchmarks.mock_n8n import start_mock_webhook
+
+        server = start_mock_webhook(args.mock_latency_ms / 1000, args.mock_latency_ms / 4000, args.mock_error_rate)
+        args.base_url = f"http://127.0.0.1:{server.server_port}"
+
+    workflows = load_workflows(base_url=args.base_url)
+    unknown = set(args.workflow) - set(workflows)
+    if unknown:
+        parser.error(f"unknown workflow(s): {', '.join(sorted(unknown))}")
+    selected = [workflows[slug] for slug in args.workflow or workflows]
+    for workflow in selected:
+        if workflow.slug in overrides:
+            workflow.url = overrides[workflow.slug]
+        elif args.mock:
+            # Give each workflow its own mock path so results stay separable
+            workflow.url = chat_url(args.base_url, workflow.slug)
+
+    # The workflows in agents/ share one webhookId, so n8n serves whichever
+    # is active at that URL
+    urls = Counter(workflow.url for workflow in selected)
+    for url, count in urls.items():
+        if count > 1:
+            print(f"Warning: {count} workflows share {url}; pass --url WORKFLOW=URL to tell them apart")
+
+    questions = load_questions(*args.dataset)
+    responses = [] if args.responses else None
+    report = asyncio.run(replay(
+        selected, questions, concurrency=args.concurrency, rate=args.rate,
+        repeat=args.repeat, timeout=args.timeout, responses=responses,
+    ))
+    print_report(report)
+
+    path = Path(args.output) if args.output else (
+        DEFAULT_REPORT_DIR / f"replay-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Report written to {path}")
+    if responses is not None:
+        with open(args.responses, "w", encoding="utf-8") as f:
+            for record in responses:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from index_manifest import DEFAULT_MANIFEST_PATH, IndexManifest
+from metrics import LatencyRecorder
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+DEFAULT_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "3600"))
+DEFAULT_SEMANTIC_THRESHOLD = float(os.getenv("RETRIEVAL_CACHE_THRESHOLD", "0.95"))
+
+
+def normalize_query(text):
+    """Collapse case and whitespace so trivially different queries share an entry"""
+    return " ".join(text.lower().split())
+
+
+class _Entry:
+    __slots__ = ("results", "vector", "created")
+
+    def __init__(self, results, vector, created):
+        self.results = results
+        self.vector = vector
+        self.created = created
+
+
+class RetrievalCache:
+    """Two-tier cache in front of vector search.
+
+    The exact tier is an LRU keyed by (backend manifest key, normalized
+    query, limit) with a TTL. When an `embedder` is given, a semantic tier
+    returns the cached top-k of any live entry for the same backend whose
+    query embedding has cosine similarity of at least `semantic_threshold`
+    with the new query. A backend's entries are dropped when its index
+    manifest generation changes, i.e. after a re-index that changed the
+    collection. `manifest_key` is the backend used when a lookup names none.
+    """
+
+    def __init__(self, embedder=None, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 semantic_threshold=DEFAULT_SEMANTIC_THRESHOLD, manifest_key=None,
+                 manifest_path=DEFAULT_MANIFEST_PATH):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic_threshold = semantic_threshold
+        self.manifest_key = manifest_key
+        self.manifest_path = manifest_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._manifest_mtime = None
+        # Last seen index manifest generation per backend manifest key
+        self.generations = {}
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.latency = {
+            "exact_hit": LatencyRecorder(),
+            "semantic_hit": LatencyRecorder(),
+            "miss": LatencyRecorder(),
+            "all": LatencyRecorder(),
+        }
+        if manifest_key is not None:
+            self._check_generation(manifest_key)
+
+    def invalidate(self, manifest_key=None):
+        """Drop every cached entry, or only those of one backend"""
+        with self._lock:
+            if manifest_key is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == manifest_key]:
+                    del self._entries[key]
+            self.invalidations += 1
+
+    def _check_generation(self, manifest_key):
+        # Only re-read the manifest when the file has been rewritten or the
+        # backend has not been seen yet
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            if mtime == self._manifest_mtime and manifest_key in self.generations:
+                return
+            self._manifest_mtime = mtime
+            keys = set(self.generations) | {manifest_key}
+        for key in keys:
+            generation = IndexManifest(key, self.manifest_path).generation
+            previous = self.generations.get(key)
+            if previous is not None and generation != previous:
+                self.invalidate(key)
+            self.generations[key] = generation
+
+    def _expired(self, entry, now):
+        return self.ttl is not None and now - entry.created > self.ttl
+
+    def _lookup_exact(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry, now):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _lookup_semantic(self, manifest_key, limit, vector, now):
+        with self._lock:
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if key[0] == manifest_key and key[2] >= limit
+                and entry.vector is not None and not self._expired(entry, now)
+            ]
+        if not candidates:
+            return None
+        matrix = np.stack([entry.vector for _, entry in candidates])
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_threshold:
+            return None
+        key, entry = candidates[best]
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry.results[:limit]
+
+    def _store(self, key, results, vector, now):
+        with self._lock:
+            self._entries[key] = _Entry(results, vector, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_search(self, query_text, limit, search_fn, manifest_key=None):
+        """Return cached results for a query, or call `search_fn(query_text, limit, query_vector)`.
+
+        `manifest_key` identifies the backend searched (see
+        VectorBackend.manifest_key). `query_vector` is the normalized query
+        embedding when the semantic tier is enabled (so the search can reuse
+        it), otherwise None.
+        """
+        start = time.perf_counter()
+        manifest_key = manifest_key if manifest_key is not None else self.manifest_key
+        if manifest_key is not None:
+            self._check_generation(manifest_key)
+        now = time.monotonic()
+        key = (manifest_key, normalize_query(query_text), limit)
+
+        entry = self._lookup_exact(key, now)
+        if entry is not None:
+            return self._finish("exact_hit", start, entry.results)
+
+        vector = None
+        if self.embedder is not None:
+            vector = np.asarray(self.embedder.embed_query(query_text), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector = vector / norm
+            results = self._lookup_semantic(manifest_key, limit, vector, now)
+            if results is not None:
+                self._store(key, results, vector, now)
+                return self._finish("semantic_hit", start, results)
+
+        results = search_fn(query_text, limit, vector)
+        self._store(key, results, vector, time.monotonic())
+        return self._finish("miss", start, results)
+
+    def _finish(self, kind, start, results):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            if kind == "exact_hit":
+                self.exact_hits += 1
+            elif kind == "semantic_hit":
+                self.semantic_hits += 1
+            else:
+                self.misses += 1
+        self.latency[kind].record(elapsed)
+        self.latency["all"].record(elapsed)
+        return results
+
+    def stats(self):
+        """Hit/miss counters and latency percentiles in milliseconds"""
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "generations": dict(self.generations),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 4) if lookups else None,
+            "latency_ms": {kind: recorder.summary(scale=1000) for kind, recorder in self.latency.items()},
+        }
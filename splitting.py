@@ -0,0 +1,150 @@
+import json
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from pathlib import Path
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from index_manifest import atomic_write, content_hash
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_CACHE_DIR = Path(os.getenv("SPLIT_CACHE_DIR", PROJECT_ROOT / ".cache" / "splits"))
+DEFAULT_PROCESSES = int(os.getenv("SPLIT_PROCESSES", "0")) or os.cpu_count() or 1
+# Starting a spawn pool re-imports langchain in every worker, which costs
+# more than splitting a small corpus, so the first pages are split in-process
+DEFAULT_PARALLEL_THRESHOLD = int(os.getenv("SPLIT_PARALLEL_THRESHOLD", "50"))
+CHUNK_SIZE = 200
+CHUNK_OVERLAP = 0
+
+# Per-process splitter, built once by the pool initializer so each worker
+# loads the tiktoken encoder a single time
+_worker_splitter = None
+
+
+def build_splitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """The token-based splitter used for ingestion"""
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+
+
+def _init_worker(chunk_size, chunk_overlap):
+    global _worker_splitter
+    _worker_splitter = build_splitter(chunk_size, chunk_overlap)
+
+
+def _split_text(text):
+    return _worker_splitter.split_text(text)
+
+
+class SplitCache:
+    """Disk cache of split results keyed by document content hash.
+
+    Entries are namespaced by splitter settings, so changing chunk size or
+    overlap never serves chunks produced under the old settings.
+    """
+
+    def __init__(self, chunk_size, chunk_overlap, cache_dir=DEFAULT_CACHE_DIR):
+        self.directory = Path(cache_dir) / f"tiktoken-{chunk_size}-{chunk_overlap}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, chunks):
+        atomic_write(self._path(key), json.dumps(chunks, ensure_ascii=False))
+
+
+class ParallelSplitter:
+    """Split documents across a process pool, preserving input order.
+
+    Documents whose content was split before are served from the cache and
+    never re-tokenized. The first `parallel_threshold` uncached documents are
+    split in-process and the pool is only started for the ones after them, so
+    small inputs never pay for it. With `processes=1` everything runs in-process.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP,
+                 processes=DEFAULT_PROCESSES, cache_dir=DEFAULT_CACHE_DIR, use_cache=True,
+                 parallel_threshold=DEFAULT_PARALLEL_THRESHOLD):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.processes = processes
+        self.parallel_threshold = parallel_threshold
+        self.cache = SplitCache(chunk_size, chunk_overlap, cache_dir) if use_cache else None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cached(self, doc):
+        if self.cache is None:
+            return None, None
+        key = content_hash(doc.page_content)
+        return key, self.cache.get(key)
+
+    def _emit(self, doc, key, chunks, from_cache):
+        if from_cache:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            if self.cache is not None:
+                self.cache.put(key, chunks)
+        for chunk in chunks:
+            yield Document(page_content=chunk, metadata=dict(doc.metadata))
+
+    def split_documents(self, docs):
+        """Yield chunks for each document in order, as soon as each is ready"""
+        docs = iter(docs)
+        splitter = None
+        split_here = 0
+        for doc in docs:
+            key, chunks = self._cached(doc)
+            from_cache = chunks is not None
+            if not from_cache:
+                if self.processes > 1 and split_here >= self.parallel_threshold:
+                    yield from self._split_in_pool(chain([doc], docs))
+                    return
+                if splitter is None:
+                    splitter = build_splitter(self.chunk_size, self.chunk_overlap)
+                chunks = splitter.split_text(doc.page_content)
+                split_here += 1
+            yield from self._emit(doc, key, chunks, from_cache)
+
+    def _split_in_pool(self, docs):
+        # Keep a bounded window of outstanding documents so a slow consumer
+        # applies backpressure to whatever feeds `docs`
+        window = 4 * self.processes
+        pending = deque()
+        # Spawn rather than fork: by now the fetch threads are running and the
+        # Weaviate/gRPC client is connected, and forking either can deadlock
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.chunk_size, self.chunk_overlap),
+        ) as executor:
+            for doc in docs:
+                key, chunks = self._cached(doc)
+                if chunks is None:
+                    pending.append((doc, key, executor.submit(_split_text, doc.page_content)))
+                else:
+                    pending.append((doc, key, chunks))
+                while len(pending) >= window:
+                    yield from self._emit_next(pending)
+            while pending:
+                yield from self._emit_next(pending)
+
+    def _emit_next(self, pending):
+        doc, key, result = pending.popleft()
+        if isinstance(result, list):
+            return self._emit(doc, key, result, from_cache=True)
+        return self._emit(doc, key, result.result(), from_cache=False)
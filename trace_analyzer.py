@@ -0,0 +1,420 @@
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import re
+import sys
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from instrumentation import DEFAULT_REPORT_DIR
+from metrics import LatencyRecorder
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+AGENTS_DIR = PROJECT_ROOT / "agents"
+DEFAULT_MAX_OPEN_TRACES = int(os.getenv("TRACE_MAX_OPEN", "10000"))
+UNMAPPED = "(unmapped)"
+BETWEEN_RUNS = "(between runs)"
+UNKNOWN_WORKFLOW = "(unknown workflow)"
+
+SUB_NODE_CONNECTIONS = {
+    "llm": "ai_languageModel",
+    "embedding": "ai_embedding",
+    "tool": "ai_tool",
+    "retriever": "ai_tool",
+}
+
+# n8n names LangChain runs "[<workflow name>] <node name>"
+RUN_NAME = re.compile(r"^\[([^\]]+)\]\s*(.+)$")
+
+
+def _normalize(name):
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+class NodeCatalog:
+    """Node names, types and sub-node attachments from the workflows in agents/"""
+
+    def __init__(self, paths=None):
+        self.workflows = set()
+        self.types = {}
+        self._by_name = defaultdict(list)
+        # (workflow, node) -> {connection type: [attached sub-nodes]}
+        self._attached = defaultdict(lambda: defaultdict(list))
+        self.attached_to = {}
+        for path in paths or sorted(AGENTS_DIR.glob("*.json")):
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            workflow = data.get("name", Path(path).stem)
+            self.workflows.add(workflow)
+            for node in data["nodes"]:
+                self.types[(workflow, node["name"])] = node["type"].rsplit(".", 1)[-1]
+                self._by_name[_normalize(node["name"])].append((workflow, node["name"]))
+            for source, outputs in data.get("connections", {}).items():
+                for connection_type, targets in outputs.items():
+                    if connection_type == "main":
+                        continue
+                    for target in (t for group in targets for t in group or ()):
+                        self._attached[(workflow, target["node"])][connection_type].append(source)
+                        self.attached_to[(workflow, source)] = target["node"]
+
+    def resolve(self, name, workflow=None):
+        """(workflow, node) for a run or node name, or None; workflow is None when ambiguous"""
+        if not name:
+            return None
+        candidates = self._by_name.get(_normalize(name))
+        if not candidates:
+            match = RUN_NAME.match(name)
+            if match is None:
+                return None
+            prefix, rest = match.groups()
+            return self.resolve(rest, prefix if prefix in self.workflows else workflow)
+        for candidate in candidates:
+            if candidate[0] == workflow:
+                return candidate
+        if len(candidates) == 1:
+            return candidates[0]
+        return None, candidates[0][1]
+
+    def workflow_of(self, name):
+        """The workflow named by a run name prefix, if any"""
+        match = RUN_NAME.match(name or "")
+        if match and match.group(1) in self.workflows:
+            return match.group(1)
+        return None
+
+    def attached(self, workflow, node, connection_type):
+        return self._attached.get((workflow, node), {}).get(connection_type, [])
+
+
+def _timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Epoch seconds or milliseconds
+        return value / 1000 if value > 1e11 else float(value)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _trace_id(record):
+    if record.get("trace_id"):
+        return str(record["trace_id"])
+    dotted_order = record.get("dotted_order")
+    if dotted_order:
+        # "<timestamp><run id>.<timestamp><run id>..." starts at the root run
+        return dotted_order.split(".", 1)[0][-36:]
+    return str(record.get("parent_run_id") or record["id"])
+
+
+def _tokens(record):
+    if record.get("run_type") != "llm":
+        # Parent runs carry their children's token totals; count LLM runs only
+        return None
+    prompt, completion = record.get("prompt_tokens"), record.get("completion_tokens")
+    if prompt is None and completion is None:
+        usage = ((record.get("outputs") or {}).get("llm_output") or {}).get("token_usage") or {}
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    if prompt is None and completion is None:
+        return None
+    return int(prompt or 0), int(completion or 0)
+
+
+def slim_run(record):
+    """Only the fields the analysis needs, so open traces stay small"""
+    metadata = (record.get("extra") or {}).get("metadata") or record.get("metadata") or {}
+    workflow = metadata.get("workflow")
+    start = _timestamp(record.get("start_time"))
+    end = _timestamp(record.get("end_time"))
+    return {
+        "id": str(record["id"]),
+        "parent": str(record["parent_run_id"]) if record.get("parent_run_id") else None,
+        "trace": _trace_id(record),
+        "name": record.get("name") or "",
+        "run_type": record.get("run_type"),
+        "start": start,
+        "end": end if end is not None else start,
+        "tokens": _tokens(record),
+        "error": bool(record.get("error")),
+        "node": metadata.get("node") if isinstance(metadata.get("node"), str) else None,
+        "workflow": workflow.get("name") if isinstance(workflow, dict) else workflow,
+        "execution": str(metadata["execution_id"]) if metadata.get("execution_id") else None,
+    }
+
+
+def _open_runs(path):
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_records(paths):
+    """Stream run records from JSONL files (optionally gzipped; "-" is stdin), None for bad lines"""
+    for path in paths:
+        with _open_runs(path) as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+
+
+class _NodeStats:
+    def __init__(self):
+        self.latency = LatencyRecorder()
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.critical_s = 0.0
+
+
+class TraceAnalyzer:
+    """Per-node latency, token and critical-path attribution over streamed runs.
+
+    Runs are grouped into traces by n8n execution id when present (n8n may
+    start a separate LangSmith trace per node), otherwise by trace id. At
+    most `max_open_traces` traces are held in memory; when more are open,
+    the least recently updated one is analyzed and dropped, and any runs
+    for it that arrive later are counted as late rather than analyzed.
+    """
+
+    def __init__(self, catalog=None, max_open_traces=DEFAULT_MAX_OPEN_TRACES):
+        self.catalog = catalog or NodeCatalog()
+        self.max_open_traces = max_open_traces
+        self._open = OrderedDict()
+        self._group_of_trace = {}
+        self._closed = OrderedDict()
+        self.nodes = defaultdict(_NodeStats)
+        self.end_to_end = defaultdict(LatencyRecorder)
+        self.end_to_end_s = defaultdict(float)
+        self.counts = Counter()
+
+    def add(self, record):
+        if record is None or "id" not in record:
+            self.counts["invalid_records"] += 1
+            return
+        run = slim_run(record)
+        if run["start"] is None:
+            self.counts["invalid_records"] += 1
+            return
+        self.counts["runs"] += 1
+        key = self._group_of_trace.get(run["trace"])
+        if key is None:
+            key = f"execution:{run['execution']}" if run["execution"] else f"trace:{run['trace']}"
+        if key in self._closed:
+            self.counts["late_runs"] += 1
+            return
+        self._group_of_trace.setdefault(run["trace"], key)
+        runs = self._open.get(key)
+        if runs is None:
+            runs = self._open[key] = []
+        self._open.move_to_end(key)
+        runs.append(run)
+        while len(self._open) > self.max_open_traces:
+            self.counts["evicted_traces"] += 1
+            self._finalize(*self._open.popitem(last=False))
+
+    def consume(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def flush(self):
+        while self._open:
+            self._finalize(*self._open.popitem(last=False))
+
+    def _finalize(self, key, runs):
+        self._closed[key] = None
+        while len(self._closed) > 10 * self.max_open_traces:
+            self._closed.popitem(last=False)
+        for trace in {run["trace"] for run in runs}:
+            self._group_of_trace.pop(trace, None)
+        self.counts["traces"] += 1
+        self._analyze(runs)
+
+    def _workflow(self, runs):
+        votes = Counter()
+        for run in runs:
+            workflow = run["workflow"] if run["workflow"] in self.catalog.workflows else None
+            workflow = workflow or self.catalog.workflow_of(run["name"])
+            if workflow:
+                votes[workflow] += 1
+        return votes.most_common(1)[0][0] if votes else None
+
+    def _label(self, run, parent_label, workflow):
+        resolved = self.catalog.resolve(run["name"], workflow)
+        if resolved is not None:
+            return resolved[1]
+        if parent_label not in (None, UNMAPPED) and run["run_type"] in SUB_NODE_CONNECTIONS:
+            # Model and tool calls belong to the sub-node wired into the parent
+            # node, e.g. the chat model of a classifier, so each LLM hop is
+            # reported on its own
+            attached = self.catalog.attached(workflow, parent_label, SUB_NODE_CONNECTIONS[run["run_type"]])
+            if len(attached) == 1:
+                return attached[0]
+        resolved = self.catalog.resolve(run["node"], workflow)
+        if resolved is not None:
+            return resolved[1]
+        return parent_label or UNMAPPED
+
+    def _analyze(self, runs):
+        workflow = self._workflow(runs)
+        by_id = {run["id"]: run for run in runs}
+        children = defaultdict(list)
+        for run in runs:
+            children[run["parent"] if run["parent"] in by_id else None].append(run)
+
+        labels = {}
+        stack = [(run, None) for run in children[None]]
+        while stack:
+            run, parent_label = stack.pop()
+            label = labels[run["id"]] = self._label(run, parent_label, workflow)
+            stats = self.nodes[(workflow, label)]
+            if label != parent_label:
+                # Only the outermost run of a node counts as one call of it
+                stats.latency.record(run["end"] - run["start"])
+                stats.errors += run["error"]
+            if run["tokens"]:
+                stats.prompt_tokens += run["tokens"][0]
+                stats.completion_tokens += run["tokens"][1]
+            stack.extend((child, label) for child in children[run["id"]])
+
+        start = min(run["start"] for run in runs)
+        end = max(run["end"] for run in runs)
+        self.end_to_end[workflow].record(end - start)
+        self.end_to_end_s[workflow] += end - start
+        credit = defaultdict(float)
+        root = {"id": None, "start": start, "end": end}
+        self._critical_path(root, end, children, credit, lambda run: labels.get(run["id"], BETWEEN_RUNS))
+        for label, seconds in credit.items():
+            self.nodes[(workflow, label)].critical_s += seconds
+
+    def _critical_path(self, run, end, children, credit, label):
+        """Credit the time on the critical path within [run start, end] to node labels.
+
+        Walking back from `end`, the child that finished last is on the
+        critical path; time not covered by any such child belongs to the run.
+        """
+        cursor = end
+        for child in sorted(children[run["id"]], key=lambda c: c["end"], reverse=True):
+            if cursor <= run["start"]:
+                break
+            if child["start"] >= cursor:
+                continue
+            child_end = min(child["end"], cursor)
+            credit[label(run)] += cursor - child_end
+            self._critical_path(child, child_end, children, credit, label)
+            cursor = max(child["start"], run["start"])
+        credit[label(run)] += max(0.0, cursor - run["start"])
+
+    def report(self):
+        """Per-workflow end-to-end latency and per-node breakdown, nodes by critical-path share"""
+        self.flush()
+        workflows = {}
+        for (workflow, node), stats in self.nodes.items():
+            name = workflow or UNKNOWN_WORKFLOW
+            entry = workflows.setdefault(name, {
+                "traces": self.end_to_end[workflow].count,
+                "end_to_end_ms": self.end_to_end[workflow].summary(scale=1000),
+                "nodes": [],
+            })
+            total = self.end_to_end_s[workflow]
+            entry["nodes"].append({
+                "node": node,
+                "type": self.catalog.types.get((workflow, node)),
+                "attached_to": self.catalog.attached_to.get((workflow, node)),
+                "calls": stats.latency.count,
+                "errors": stats.errors,
+                "latency_ms": stats.latency.summary(scale=1000),
+                "tokens": {
+                    "prompt": stats.prompt_tokens,
+                    "completion": stats.completion_tokens,
+                    "total": stats.prompt_tokens + stats.completion_tokens,
+                },
+                "critical_path_s": round(stats.critical_s, 3),
+                "critical_path_share": round(stats.critical_s / total, 4) if total else None,
+            })
+        for entry in workflows.values():
+            entry["nodes"].sort(key=lambda n: n["critical_path_s"], reverse=True)
+            llm_nodes = [n for n in entry["nodes"] if n["type"] == "lmChatOpenAi"]
+            entry["dominant_llm_node"] = llm_nodes[0]["node"] if llm_nodes else None
+        return {"counts": dict(self.counts), "workflows": workflows}
+
+
+def export_runs(project_name, path, since_hours=24, client=None):
+    """Stream a LangSmith project's runs to a JSONL file"""
+    if client is None:
+        from langsmith import Client
+
+        client = Client()
+    start_time = datetime.now(timezone.utc) - timedelta(hours=since_hours)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for run in client.list_runs(project_name=project_name, start_time=start_time):
+            f.write(run.json() + "\n")
+            count += 1
+    return count
+
+
+def _display(node):
+    if node["attached_to"]:
+        return f"{node['node']} -> {node['attached_to']}"
+    return node["node"]
+
+
+def print_report(report):
+    counts = report["counts"]
+    print(f"{counts.get('runs', 0)} runs in {counts.get('traces', 0)} traces "
+          f"({counts.get('late_runs', 0)} late, {counts.get('invalid_records', 0)} invalid)")
+    for workflow, entry in report["workflows"].items():
+        e2e = entry["end_to_end_ms"]
+        print(f"\n{workflow}: {entry['traces']} traces, end-to-end ms p50={e2e['p50']} p95={e2e['p95']}")
+        if entry["dominant_llm_node"]:
+            print(f"  dominant LLM hop: {entry['dominant_llm_node']}")
+        print(f"  {'node':<80} {'calls':>6} {'p50 ms':>10} {'p95 ms':>10} {'tokens':>9} {'crit %':>7}")
+        for node in entry["nodes"]:
+            share = node["critical_path_share"]
+            print(f"  {_display(node)[:80]:<80} {node['calls']:>6} {str(node['latency_ms']['p50']):>10} "
+                  f"{str(node['latency_ms']['p95']):>10} {node['tokens']['total']:>9} "
+                  f"{'' if share is None else f'{share * 100:.1f}':>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Attribute trace latency and tokens to n8n workflow nodes")
+    parser.add_argument("runs", nargs="*", help="JSONL run exports (.jsonl or .jsonl.gz, - for stdin)")
+    parser.add_argument(
+        "--agents", nargs="+", default=None,
+        help="workflow JSON files to map nodes from (default: agents/*.json)",
+    )
+    parser.add_argument("--max-open-traces", type=int, default=DEFAULT_MAX_OPEN_TRACES)
+    parser.add_argument("--export-project", help="first export this LangSmith project's runs to the runs file")
+    parser.add_argument("--since-hours", type=float, default=24, help="how far back --export-project goes")
+    parser.add_argument("--output", help="report path (default: a timestamped file in INGEST_REPORT_DIR)")
+    args = parser.parse_args()
+
+    if args.export_project:
+        if len(args.runs) != 1:
+            parser.error("--export-project needs exactly one runs file to write")
+        count = export_runs(args.export_project, args.runs[0], args.since_hours)
+        print(f"Exported {count} runs to {args.runs[0]}")
+    if not args.runs:
+        parser.error("no runs file given")
+
+    analyzer = TraceAnalyzer(NodeCatalog(args.agents), max_open_traces=args.max_open_traces)
+    report = analyzer.consume(iter_records(args.runs)).report()
+    print_report(report)
+
+    path = Path(args.output) if args.output else (
+        DEFAULT_REPORT_DIR / f"traces-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport written to {path}")
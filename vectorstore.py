@@ -1,12 +1,24 @@
+import argparse
+import atexit
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import weaviate
 from dotenv import load_dotenv
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import WebBaseLoader
 from langchain_openai import OpenAIEmbeddings
 from weaviate.classes.init import Auth
 import weaviate.classes as wvc
 
+from embeddings import DEFAULT_BATCH_SIZE as EMBED_BATCH_SIZE, EmbeddingCache, embed_with_cache, get_embedder
+from fetcher import iter_documents
+from instrumentation import RunRecorder, export_to_langsmith
+from index_manifest import IndexManifest, chunk_uuid, content_hash, properties_hash
+from local_index import DEFAULT_ALPHA, LocalIndex
+from splitting import ParallelSplitter
+
 load_dotenv()
 
 # Set OpenAI API key for Weaviate vectorization
@@ -14,6 +26,11 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 if openai_api_key:
     os.environ["OPENAI_API_KEY"] = openai_api_key
 
+COLLECTION_NAME = "LangGraphDocs"
+DELETE_BATCH_SIZE = 100
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", "3"))
+RETRY_BACKOFF_S = 1.0
+
 LANGGRAPH_DOCS = [
     "https://langchain-ai.github.io/langgraph/",
     "https://langchain-ai.github.io/langgraph/tutorials/customer-support/customer-support/",
@@ -35,17 +52,19 @@ LANGGRAPH_DOCS = [
     "https://langchain-ai.github.io/langgraph/concepts/faq/"
 ]
 
-def get_weaviate_client():
+def get_weaviate_client(verbose=True):
     """Get Weaviate client with authentication"""
     weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
     weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
     
-    print(f"Attempting to connect to Weaviate at: {weaviate_url}")
+    if verbose:
+        print(f"Attempting to connect to Weaviate at: {weaviate_url}")
     
     try:
         if weaviate_api_key and ".cloud" in weaviate_url:
             # Use Weaviate Cloud Services connection
-            print("Connecting to Weaviate Cloud Services...")
+            if verbose:
+                print("Connecting to Weaviate Cloud Services...")
             auth_config = Auth.api_key(weaviate_api_key)
             
             # Add OpenAI API key to headers for vectorization
@@ -60,10 +79,12 @@ def get_weaviate_client():
             )
         else:
             # For local instance without authentication
-            print("Connecting to local Weaviate instance...")
+            if verbose:
+                print("Connecting to local Weaviate instance...")
             client = weaviate.connect_to_local()
         
-        print("Successfully connected to Weaviate!")
+        if verbose:
+            print("Successfully connected to Weaviate!")
         return client
         
     except Exception as e:
@@ -77,13 +98,84 @@ def get_weaviate_client():
         print("WEAVIATE_API_KEY=your-api-key-here")
         raise
 
-def create_collection_schema(client):
-    """Create the LangGraph docs collection schema"""
-    collection_name = "LangGraphDocs"
+class WeaviateClientManager:
+    """Process-wide Weaviate client with lazy connect, health checks and reconnect.
+
+    The client is created on first use and shared by every caller. It is
+    health-checked at most every `health_check_interval` seconds and
+    replaced if it stops responding or a query fails with a connection error.
+    """
+
+    def __init__(self, connect=None, health_check_interval=30.0):
+        self._connect = connect or (lambda: get_weaviate_client(verbose=False))
+        self.health_check_interval = health_check_interval
+        self._client = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return a connected client, connecting or reconnecting as needed"""
+        with self._lock:
+            now = time.monotonic()
+            if self._client is not None and now - self._last_check >= self.health_check_interval:
+                self._last_check = now
+                if not self._is_healthy(self._client):
+                    print("Weaviate client is unhealthy; reconnecting")
+                    self._close_client()
+            if self._client is None:
+                self._client = self._connect()
+                self._last_check = now
+            return self._client
+
+    def reset(self, client=None):
+        """Drop the current client (only if it is still `client`, when given)"""
+        with self._lock:
+            if client is None or client is self._client:
+                self._close_client()
+
+    def close(self):
+        """Close the shared client, e.g. at interpreter exit"""
+        self.reset()
+
+    @staticmethod
+    def _is_healthy(client):
+        try:
+            return client.is_ready()
+        except Exception:
+            return False
+
+    def _close_client(self):
+        if self._client is not None:
+            try:
+                self._client.close()
+            except Exception:
+                pass
+        self._client = None
+
+
+client_manager = WeaviateClientManager()
+atexit.register(client_manager.close)
+
+RETRYABLE_QUERY_ERRORS = (
+    weaviate.exceptions.WeaviateConnectionError,
+    weaviate.exceptions.WeaviateClosedClientError,
+    weaviate.exceptions.WeaviateQueryError,
+)
+
+def create_collection_schema(client, recreate=False):
+    """Create the LangGraph docs collection schema.
+
+    An existing collection is reused unless `recreate` is set, so retrieval
+    keeps working while an incremental sync runs.
+    """
+    collection_name = COLLECTION_NAME
     
     try:
-        # Delete existing collection if it exists
         if client.collections.exists(collection_name):
+            if not recreate:
+                print(f"Using existing collection: {collection_name}")
+                return client.collections.get(collection_name), False
+            # Delete existing collection for a full rebuild
             client.collections.delete(collection_name)
             print(f"Deleted existing collection: {collection_name}")
     except Exception as e:
@@ -116,86 +208,661 @@ def create_collection_schema(client):
     )
     
     print(f"Created collection: {collection_name}")
-    return collection
+    return collection, True
+
+@dataclass
+class SearchResult:
+    """One retrieved chunk"""
+    uuid: str
+    content: str
+    source: str
+    title: str
+    score: float = None
+    distance: float = None
+
+@dataclass
+class FailedObject:
+    """An object the backend rejected in the last batch"""
+    uuid: str
+    properties: dict
+    vector: list = None
+    message: str = ""
+
+class VectorBackend:
+    """Storage for the LangGraphDocs collection.
+
+    Ingestion and retrieval go through this interface so the collection can
+    live in Weaviate or in an in-process LocalIndex.
+    """
+
+    # How the backend is named in progress output
+    label = "the vector store"
+    # Whether objects must arrive with vectors, i.e. there is no server-side vectorizer
+    needs_client_vectors = False
+
+    def manifest_key(self):
+        """Index manifest section for this backend's collection"""
+        raise NotImplementedError
+
+    def open(self, recreate=False):
+        """Create or reuse the collection; returns True if it was created"""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def object_ids(self):
+        """Iterate the UUIDs of every stored object"""
+        raise NotImplementedError
+
+    def batch(self):
+        """Context manager whose `add_object(properties, uuid, vector)` upserts objects"""
+        raise NotImplementedError
+
+    def failed_objects(self):
+        """FailedObjects from the last batch"""
+        return []
+
+    def batch_size(self, batch):
+        """Current batch size chosen by the backend's batcher, if it has one"""
+        return None
+
+    def delete(self, uuids):
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist pending writes"""
+
+    def search(self, query_text, limit=5, query_vector=None, mode="vector", alpha=DEFAULT_ALPHA):
+        """Return SearchResults for a vector, "bm25" or "hybrid" query"""
+        raise NotImplementedError
+
+class WeaviateBackend(VectorBackend):
+    """The LangGraphDocs collection in Weaviate, over a shared client"""
+
+    label = "Weaviate"
+
+    def __init__(self, manager=None):
+        self.manager = manager or client_manager
+        self._batch_collection = None
+
+    def manifest_key(self):
+        return f"{os.getenv('WEAVIATE_URL', 'http://localhost:8080')}#{COLLECTION_NAME}"
+
+    def _collection(self):
+        return self.manager.get().collections.get(COLLECTION_NAME)
+
+    def open(self, recreate=False):
+        _, created = create_collection_schema(self.manager.get(), recreate=recreate)
+        return created
+
+    def count(self):
+        return self._collection().aggregate.over_all(total_count=True).total_count
+
+    def object_ids(self):
+        for obj in self._collection().iterator(return_properties=[]):
+            yield str(obj.uuid)
+
+    def batch(self):
+        # Failed objects are tracked per collection handle, so keep this one
+        self._batch_collection = self._collection()
+        return self._batch_collection.batch.dynamic()
+
+    def failed_objects(self):
+        if self._batch_collection is None:
+            return []
+        return [
+            FailedObject(
+                uuid=str(err.object_.uuid),
+                properties=err.object_.properties,
+                vector=err.object_.vector,
+                message=err.message,
+            )
+            for err in self._batch_collection.batch.failed_objects
+        ]
+
+    def batch_size(self, batch):
+        # The dynamic batcher keeps its current size in a private attribute;
+        # report nothing rather than fail if the client changes it
+        return getattr(batch, "_BatchBase__recommended_num_objects", None)
+
+    def delete(self, uuids):
+        self._collection().data.delete_many(
+            where=wvc.query.Filter.by_id().contains_any(list(uuids))
+        )
+
+    def _query(self, collection, query_text, limit, query_vector, mode, alpha):
+        if mode == "bm25":
+            return collection.query.bm25(
+                query=query_text,
+                limit=limit,
+                return_metadata=wvc.query.MetadataQuery(score=True)
+            )
+        if mode == "hybrid":
+            return collection.query.hybrid(
+                query=query_text,
+                vector=list(map(float, query_vector)) if query_vector is not None else None,
+                alpha=alpha,
+                limit=limit,
+                return_metadata=wvc.query.MetadataQuery(score=True)
+            )
+        if query_vector is not None:
+            return collection.query.near_vector(
+                near_vector=list(map(float, query_vector)),
+                limit=limit,
+                return_metadata=wvc.query.MetadataQuery(distance=True)
+            )
+        return collection.query.near_text(
+            query=query_text,
+            limit=limit,
+            return_metadata=wvc.query.MetadataQuery(score=True, distance=True)
+        )
+
+    def search(self, query_text, limit=5, query_vector=None, mode="vector", alpha=DEFAULT_ALPHA):
+        # A query that fails because the connection dropped is retried once on
+        # a fresh client. gRPC outages surface as WeaviateQueryError too, so
+        # those are only retried when the client no longer reports ready.
+        for attempt in range(2):
+            client = self.manager.get()
+            try:
+                collection = client.collections.get(COLLECTION_NAME)
+                response = self._query(collection, query_text, limit, query_vector, mode, alpha)
+                break
+            except RETRYABLE_QUERY_ERRORS as e:
+                if isinstance(e, weaviate.exceptions.WeaviateQueryError) and self.manager._is_healthy(client):
+                    raise
+                self.manager.reset(client)
+                if attempt:
+                    raise
+        return [
+            SearchResult(
+                uuid=str(obj.uuid),
+                content=obj.properties.get("content", ""),
+                source=obj.properties.get("source", ""),
+                title=obj.properties.get("title", ""),
+                score=obj.metadata.score,
+                distance=obj.metadata.distance,
+            )
+            for obj in response.objects
+        ]
+
+class _LocalBatch:
+    def __init__(self, index):
+        self.index = index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_object(self, properties, uuid, vector=None):
+        self.index.upsert(uuid, properties, vector)
+
+class LocalBackend(VectorBackend):
+    """The LangGraphDocs collection in an in-process LocalIndex.
+
+    Objects need client-side vectors, so ingest with an embedder and query
+    with the same one (or use mode="bm25").
+    """
+
+    label = "the local index"
+    needs_client_vectors = True
+
+    def __init__(self, index=None):
+        self.index = index if index is not None else LocalIndex()
+
+    def manifest_key(self):
+        return f"local:{self.index.directory.resolve()}#{COLLECTION_NAME}"
+
+    def open(self, recreate=False):
+        if recreate:
+            self.index.clear()
+            return True
+        return len(self.index) == 0
+
+    def count(self):
+        return len(self.index)
+
+    def object_ids(self):
+        return list(self.index.row_of)
+
+    def batch(self):
+        return _LocalBatch(self.index)
 
-def load_and_upload_docs():
-    """Load documents from URLs and upload to Weaviate"""
-    print("Loading documents from URLs...")
-    docs = [WebBaseLoader(url).load() for url in LANGGRAPH_DOCS]
-    docs_list = [item for sublist in docs for item in sublist]
+    def delete(self, uuids):
+        self.index.delete(uuids)
+
+    def flush(self):
+        self.index.save()
+
+    def search(self, query_text, limit=5, query_vector=None, mode="vector", alpha=DEFAULT_ALPHA):
+        if mode == "bm25":
+            hits = self.index.search_bm25(query_text, limit)
+        elif query_vector is None:
+            raise ValueError("LocalBackend needs a query vector; pass the embedder used at ingestion")
+        elif mode == "hybrid":
+            hits = self.index.search_hybrid(query_text, query_vector, limit, alpha=alpha)
+        else:
+            hits = self.index.search_vector(query_vector, limit)
+        return [
+            SearchResult(
+                uuid=hit["uuid"],
+                content=hit["properties"].get("content", ""),
+                source=hit["properties"].get("source", ""),
+                title=hit["properties"].get("title", ""),
+                score=hit["score"],
+                distance=hit["distance"],
+            )
+            for hit in hits
+        ]
+
+def get_backend(name):
+    """Resolve a backend by name: weaviate or local"""
+    if name == "weaviate":
+        return WeaviateBackend(client_manager)
+    if name == "local":
+        return LocalBackend()
+    raise ValueError(f"Unknown backend: {name}")
+
+default_backend = WeaviateBackend(client_manager)
+
+def to_data_objects(chunks):
+    """Yield (uuid, properties) pairs using deterministic chunk UUIDs"""
+    current_source = None
+    occurrences = {}
+    position = 0
+    for doc in chunks:
+        source = doc.metadata.get("source", "")
+        # Chunks arrive grouped by page, so duplicates only need tracking per page
+        if source != current_source:
+            current_source = source
+            occurrences = {}
+            position = 0
+        key = content_hash(doc.page_content)
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        yield chunk_uuid(source, doc.page_content, occurrence), {
+            "content": doc.page_content,
+            "source": source,
+            # Untitled pages are named by URL and position within the page, so
+            # changes to other pages leave these properties (and vectors) alone
+            "title": doc.metadata.get("title", f"{source or 'Document'} #{position}")
+        }
+        position += 1
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None if unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class IngestStats:
+    """Counters and timings for one ingestion run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.destination = "the vector store"
+        self.first_upload_at = None
+        self.chunks = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.retried = 0
+        self.failed = 0
+
+    def mark_upload(self):
+        if self.first_upload_at is None:
+            self.first_upload_at = time.perf_counter()
+
+    def report(self):
+        """Print and return a summary of the run"""
+        elapsed = time.perf_counter() - self.started
+        first_upload = None
+        if self.first_upload_at is not None:
+            first_upload = self.first_upload_at - self.started
+        summary = {
+            "chunks": self.chunks,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "retried": self.retried,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 3),
+            "time_to_first_upload_s": round(first_upload, 3) if first_upload is not None else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1) if peak_rss_mb() is not None else None,
+        }
+        print(f"Synced {self.chunks} document chunks to {self.destination} "
+              f"({self.inserted} inserted, {self.updated} updated, {self.deleted} deleted, "
+              f"{self.failed} failed)")
+        if first_upload is not None:
+            print(f"Time to first upload: {first_upload:.2f}s")
+        print(f"Total time: {elapsed:.2f}s, peak RSS: {summary['peak_rss_mb']} MiB")
+        return summary
+
+def reconcile_manifest(backend, manifest):
+    """Rebuild the manifest from the backend if it no longer matches the collection"""
+    total = backend.count()
+    if total == len(manifest.objects):
+        return
+    print(f"Manifest lists {len(manifest.objects)} objects but collection has {total}; reconciling")
+    indexed = {}
+    for uuid in backend.object_ids():
+        indexed[uuid] = manifest.objects.get(uuid)
+    manifest.reset(indexed)
+
+def vectorizer_id(embedder=None):
+    """What produces the collection's vectors: the server-side vectorizer or a client-side model"""
+    return "server" if embedder is None else f"{embedder.model}/{embedder.dimensions}"
+
+def embed_objects(objects, embedder, cache=None):
+    """Embed (uuid, properties) contents client-side, reusing vectors cached by chunk hash"""
+    contents = [obj["content"] for _, obj in objects]
+    vectors, hits = embed_with_cache(
+        contents, [content_hash(content) for content in contents], embedder, cache
+    )
+    return vectors, hits
+
+def retry_failed(backend, failed, stats, recorder):
+    """Re-upload failed objects with exponential backoff; returns those that still fail"""
+    for attempt in range(1, UPLOAD_RETRIES + 1):
+        if not failed:
+            break
+        time.sleep(RETRY_BACKOFF_S * 2 ** (attempt - 1))
+        print(f"Retrying {len(failed)} failed objects (attempt {attempt}/{UPLOAD_RETRIES})")
+        stats.retried += len(failed)
+        with recorder.span("retry", attempt=attempt, objects=len(failed)):
+            with backend.batch() as batch:
+                for obj in failed:
+                    batch.add_object(
+                        properties=obj.properties,
+                        uuid=obj.uuid,
+                        vector=obj.vector
+                    )
+        failed = backend.failed_objects()
+    return failed
+
+def sync_collection(backend, objects, manifest, embedder=None, stats=None, embedding_cache=None,
+                    recorder=None):
+    """Stream (uuid, properties) pairs into the backend's collection.
+
+    New and changed objects are uploaded as they arrive, unchanged ones are
+    skipped, and objects in the manifest that were not seen are deleted once
+    the stream ends. Weaviate's dynamic batcher blocks `add_object` while its
+    queue is full, which in turn slows the upstream fetch and split stages.
+    Failed objects are retried up to UPLOAD_RETRIES times. For each group of
+    up to EMBED_BATCH_SIZE changed objects, an "embed" and an "upload_group"
+    span (time to queue the group on the backend's batcher) are recorded on
+    `recorder`.
+    """
+    stats = stats or IngestStats()
+    stats.destination = backend.label
+    recorder = recorder or RunRecorder()
+    seen = set()
+    uploaded = {}
+    embedded = cached = 0
     
-    print(f"Loaded {len(docs_list)} documents")
+    vectorizer = vectorizer_id(embedder)
+    if manifest.use_vectorizer(vectorizer):
+        print(f"Vectors in the collection were not produced by {vectorizer}; re-uploading every object")
+    if embedder is not None and embedding_cache is None:
+        # Opened once per run: loading reads every cached key
+        embedding_cache = EmbeddingCache(embedder.model, embedder.dimensions)
     
-    # Split documents
-    text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-        chunk_size=200, chunk_overlap=0
-    )
-    doc_splits = text_splitter.split_documents(docs_list)
+    # Objects with an existing UUID are replaced in place
+    with backend.batch() as batch:
+        for group in batched(objects, EMBED_BATCH_SIZE):
+            pending = []
+            for uuid, obj in group:
+                stats.chunks += 1
+                seen.add(uuid)
+                action = manifest.classify(uuid, obj)
+                if action == "insert":
+                    stats.inserted += 1
+                elif action == "update":
+                    stats.updated += 1
+                else:
+                    stats.unchanged += 1
+                    continue
+                pending.append((uuid, obj))
+            
+            if not pending:
+                continue
+            
+            vectors = [None] * len(pending)
+            if embedder is not None:
+                with recorder.span("embed", objects=len(pending)) as span:
+                    vectors, hits = embed_objects(pending, embedder, embedding_cache)
+                    span["cached"] = hits
+                embedded += len(pending)
+                cached += hits
+            
+            # Weaviate's batcher sends its own batches from background threads,
+            # so this times handing one embedding group to it, including any
+            # wait on its backpressure, not individual network batches
+            with recorder.span("upload_group", objects=len(pending)) as span:
+                for (uuid, obj), vector in zip(pending, vectors):
+                    stats.mark_upload()
+                    batch.add_object(
+                        properties=obj,
+                        uuid=uuid,
+                        vector=vector.tolist() if vector is not None else None
+                    )
+                    uploaded[uuid] = properties_hash(obj)
+                span["batch_size"] = backend.batch_size(batch)
+            recorder.record_batch_size(span["batch_size"])
     
-    print(f"Split into {len(doc_splits)} chunks")
+    if embedder is not None:
+        print(f"Embedded {embedded} chunks with {embedder.model} "
+              f"({cached} cached, {embedded - cached} computed)")
     
-    # Connect to Weaviate
-    client = get_weaviate_client()
+    failed_objects = backend.failed_objects()
+    for obj in failed_objects:
+        recorder.record_error(obj.message)
+    failed_objects = retry_failed(backend, failed_objects, stats, recorder)
+    failed = {obj.uuid for obj in failed_objects}
+    stats.failed = len(failed)
+    if failed:
+        print(f"Warning: {len(failed)} objects still failed after retries and will be retried next run")
+    for uuid, digest in uploaded.items():
+        if uuid not in failed:
+            manifest.objects[uuid] = digest
     
-    try:
-        # Create collection
-        collection = create_collection_schema(client)
-        
-        # Prepare data for batch upload
-        data_objects = []
-        for i, doc in enumerate(doc_splits):
-            data_objects.append({
-                "content": doc.page_content,
-                "source": doc.metadata.get("source", ""),
-                "title": doc.metadata.get("title", f"Document {i}")
-            })
-        
-        # Batch upload
-        print("Uploading documents to Weaviate...")
-        with collection.batch.dynamic() as batch:
-            for obj in data_objects:
-                batch.add_object(
-                    properties=obj
-                )
-        
-        print(f"Successfully uploaded {len(data_objects)} document chunks to Weaviate")
-        
-        # Verify upload
-        response = collection.aggregate.over_all(
-            total_count=True
-        )
-        print(f"Total objects in collection: {response.total_count}")
-        
-    finally:
-        client.close()
+    to_delete = manifest.stale(seen)
+    for start in range(0, len(to_delete), DELETE_BATCH_SIZE):
+        chunk = to_delete[start:start + DELETE_BATCH_SIZE]
+        with recorder.span("delete", objects=len(chunk)):
+            backend.delete(chunk)
+        for uuid in chunk:
+            manifest.objects.pop(uuid, None)
+    stats.deleted = len(to_delete)
+    backend.flush()
+    
+    return stats
+
+def load_and_upload_docs(rebuild=False, embedder=None, backend=None, report_path=None,
+                         langsmith=False):
+    """Load documents from URLs and sync them into the vector store.
 
-def query_weaviate(query_text, limit=5):
-    """Query the Weaviate collection"""
-    client = get_weaviate_client()
+    Fetching, splitting and uploading run as a streaming pipeline, so the
+    first objects reach the store as soon as the first page is split and
+    memory stays flat as the corpus grows. By default only new, changed and
+    stale chunks are written; `rebuild` drops and recreates the collection
+    first. With an `embedder`, vectors are computed client-side and uploaded
+    with the objects instead of being produced by the collection's vectorizer.
+    `backend` defaults to Weaviate.
     
-    try:
-        collection = client.collections.get("LangGraphDocs")
-        
-        response = collection.query.near_text(
-            query=query_text,
-            limit=limit,
-            return_metadata=wvc.query.MetadataQuery(score=True)
-        )
-        
-        print(f"Query: {query_text}")
-        print(f"Found {len(response.objects)} results:")
-        
-        for i, obj in enumerate(response.objects):
-            print(f"\n{i+1}. Score: {obj.metadata.score:.4f}")
-            print(f"Source: {obj.properties['source']}")
-            print(f"Content: {obj.properties['content'][:200]}...")
-            
-    finally:
-        client.close()
+    A JSON run report with per-stage timings, per-page and per-group spans,
+    error counts and the batcher's batch sizes is written to `report_path`
+    (default: INGEST_REPORT_DIR), and also sent to LangSmith as a trace when
+    `langsmith` is set. Returns that report.
+    """
+    backend = backend or WeaviateBackend(client_manager)
+    # Checked before anything is fetched, rather than failing at the first upsert
+    if backend.needs_client_vectors and embedder is None:
+        raise ValueError(f"Ingesting into {backend.label} needs client-side vectors; "
+                         "pass an embedder (EMBEDDER=openai or local)")
+    stats = IngestStats()
+    recorder = RunRecorder("ingest")
+    
+    text_splitter = ParallelSplitter(chunk_size=200, chunk_overlap=0)
+    
+    created = backend.open(recreate=rebuild)
+    
+    manifest = IndexManifest(backend.manifest_key())
+    if created:
+        manifest.reset()
+    else:
+        reconcile_manifest(backend, manifest)
+    
+    print("Loading, splitting and uploading documents...")
+    stages = recorder.stages
+    docs = stages.wrap("fetch", iter_documents(LANGGRAPH_DOCS, recorder=recorder))
+    chunks = stages.wrap("split", text_splitter.split_documents(docs))
+    objects = stages.wrap("transform", to_data_objects(chunks))
+    sync_started = time.perf_counter()
+    sync_collection(backend, objects, manifest, embedder, stats, recorder=recorder)
+    # Whatever sync time was not spent pulling from the pipeline went to embedding and upload
+    stages.inclusive["embed_and_upload"] = time.perf_counter() - sync_started
+    print(f"Split {text_splitter.cache_hits + text_splitter.cache_misses} documents "
+          f"({text_splitter.cache_hits} unchanged, served from split cache)")
+    recorder.increment("documents_split_cached", text_splitter.cache_hits)
+    recorder.increment("documents_split", text_splitter.cache_misses)
+    manifest.save(changed=created or bool(stats.inserted or stats.updated or stats.deleted))
+    
+    summary = stats.report()
+    
+    # Verify upload
+    summary["total_objects"] = backend.count()
+    print(f"Total objects in collection: {summary['total_objects']}")
+    
+    report = recorder.report(summary, stage_order=["fetch", "split", "transform", "embed_and_upload"])
+    print("Stage time (s): " + ", ".join(f"{name} {seconds}" for name, seconds in report["stage_time_s"].items()))
+    print(f"Wrote run report to {recorder.write(report, report_path)}")
+    if langsmith:
+        export_to_langsmith(recorder, report)
+        print("Sent run report to LangSmith")
+    
+    return report
+
+def search(query_text, limit=5, embedder=None, query_vector=None, mode="vector",
+           alpha=DEFAULT_ALPHA, backend=None):
+    """Search the collection and return SearchResults.
+
+    Pass the `embedder` used at ingestion time (or a precomputed
+    `query_vector`) to search with a client-side vector instead of the
+    collection's vectorizer. `mode` is "vector", "bm25" or "hybrid".
+    `backend` defaults to the shared Weaviate backend.
+    """
+    backend = backend or default_backend
+    if query_vector is None and embedder is not None and mode != "bm25":
+        query_vector = embedder.embed_query(query_text)
+    return backend.search(query_text, limit=limit, query_vector=query_vector, mode=mode, alpha=alpha)
+
+def cached_search(query_text, limit=5, embedder=None, cache=None, backend=None):
+    """search() behind a RetrievalCache.
+
+    Entries are kept per backend and dropped when a re-index changes that
+    backend's collection. The cache's query embedding is reused for
+    near_vector only when it comes from the same model as the ingestion
+    `embedder`.
+    """
+    if cache is None:
+        return search(query_text, limit=limit, embedder=embedder, backend=backend)
+    backend = backend or default_backend
+    
+    def run(text, k, cache_vector):
+        if cache_vector is not None and embedder is not None and cache.embedder.model == embedder.model:
+            return search(text, limit=k, query_vector=cache_vector, backend=backend)
+        return search(text, limit=k, embedder=embedder, backend=backend)
+    
+    return cache.get_or_search(query_text, limit, run, manifest_key=backend.manifest_key())
+
+def query_many(texts, limit=5, embedder=None, max_workers=8, cache=None, backend=None):
+    """Run many searches concurrently over the shared client.
+
+    Returns one list of SearchResults per input text, in input order. With an
+    `embedder` and no cache, all query vectors are computed in a single batch
+    first; with a `cache`, each query goes through it.
+    """
+    texts = list(texts)
+    if cache is not None:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda text: cached_search(text, limit=limit, embedder=embedder, cache=cache, backend=backend),
+                texts,
+            ))
+    vectors = [None] * len(texts)
+    if embedder is not None and texts:
+        vectors = embedder.embed_documents(texts)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(
+            lambda args: search(args[0], limit=limit, query_vector=args[1], backend=backend),
+            zip(texts, vectors),
+        ))
+
+def query_weaviate(query_text, limit=5, embedder=None, cache=None, backend=None):
+    """Query the Weaviate collection and print the results.
+
+    Pass the `embedder` used at ingestion time to search with a client-side
+    query vector instead of the collection's vectorizer, and a RetrievalCache
+    to serve repeated or near-duplicate queries without a round trip.
+    """
+    results = cached_search(query_text, limit=limit, embedder=embedder, cache=cache, backend=backend)
+    
+    print(f"Query: {query_text}")
+    print(f"Found {len(results)} results:")
+    
+    for i, result in enumerate(results):
+        if result.score is not None:
+            print(f"\n{i+1}. Score: {result.score:.4f}")
+        else:
+            print(f"\n{i+1}. Distance: {result.distance:.4f}")
+        print(f"Source: {result.source}")
+        print(f"Content: {result.content[:200]}...")
+    
+    return results
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index the LangGraph docs into a vector store")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Drop and recreate the collection instead of syncing incrementally")
+    parser.add_argument("--embedder", choices=["server", "openai", "local"],
+                        default=os.getenv("EMBEDDER", "server"),
+                        help="Where chunk vectors come from: the collection's vectorizer (server), "
+                             "client-side OpenAI, or the offline local embedder")
+    parser.add_argument("--report", help="Where to write the JSON run report")
+    parser.add_argument("--langsmith", action="store_true",
+                        help="Also send the run report to LangSmith as a trace")
+    parser.add_argument("--backend", choices=["weaviate", "local"],
+                        default=os.getenv("VECTOR_BACKEND", "weaviate"),
+                        help="Store the collection in Weaviate or in an in-process local index")
+    args = parser.parse_args()
+    if args.backend == "local" and args.embedder == "server":
+        parser.error("--backend local needs client-side vectors; use --embedder openai or local")
+    embedder = get_embedder(args.embedder)
+    backend = get_backend(args.backend)
+    
     # Load and upload documents
-    load_and_upload_docs()
+    load_and_upload_docs(rebuild=args.rebuild, embedder=embedder, backend=backend,
+                         report_path=args.report, langsmith=args.langsmith)
     
     # Example query
-    query_weaviate("How do I create a multi-agent system?")
\ No newline at end of file
+    query_weaviate("How do I create a multi-agent system?", embedder=embedder, backend=backend)
\ No newline at end of file